@@ -17,18 +17,26 @@ from jacked.api.websocket import WebSocketRegistry
 
 logger = logging.getLogger(__name__)
 
+# New rows (MAX(id), rowid lookup) and newly ended ones (MAX(ended_at), the
+# leading idx_sa_active column). Separate subqueries so each MAX is an index
+# seek — two aggregates in one SELECT force a full scan on every heartbeat.
+_SESSION_CHANGE_SQL = (
+    "SELECT (SELECT MAX(id) FROM session_accounts), "
+    "(SELECT MAX(ended_at) FROM session_accounts)"
+)
+
 
 async def session_accounts_watch_loop(app, interval: int = 3):
     """Watch session_accounts table for changes, broadcast via WebSocket.
 
     Uses PRAGMA data_version (connection-scoped) to cheaply detect when any
     external process writes to the DB.  Only queries session_accounts when
-    the version changes, and only broadcasts when the actual MAX timestamps
-    differ from cached values.
+    the version changes, and only broadcasts when the newest row id or
+    MAX(ended_at) differ from cached values.
 
     Also forces a periodic broadcast every ~60s (20 cycles) to handle
     time-based session expiry.  Heartbeat writes change data_version but
-    the secondary MAX(detected_at)/MAX(ended_at) check filters them out
+    the secondary MAX(id)/MAX(ended_at) check filters them out
     (heartbeats only touch last_activity_at).  The periodic broadcast
     ensures the dashboard re-evaluates the 60-minute read-side filter.
 
@@ -47,7 +55,7 @@ async def session_accounts_watch_loop(app, interval: int = 3):
     conn.execute("PRAGMA busy_timeout = 5000")
 
     last_data_version: int | None = None
-    last_max_detected: str | None = None
+    last_max_id: int | None = None
     last_max_ended: str | None = None
     cycle_counter = 0
     FORCE_BROADCAST_EVERY = 20  # ~60s at 3s interval
@@ -55,11 +63,9 @@ async def session_accounts_watch_loop(app, interval: int = 3):
     # Seed initial values
     try:
         last_data_version = conn.execute("PRAGMA data_version").fetchone()[0]
-        row = conn.execute(
-            "SELECT MAX(detected_at), MAX(ended_at) FROM session_accounts"
-        ).fetchone()
+        row = conn.execute(_SESSION_CHANGE_SQL).fetchone()
         if row:
-            last_max_detected, last_max_ended = row[0], row[1]
+            last_max_id, last_max_ended = row[0], row[1]
     except sqlite3.Error:
         pass
 
@@ -81,14 +87,12 @@ async def session_accounts_watch_loop(app, interval: int = 3):
                 if dv != last_data_version:
                     last_data_version = dv
                     row = await asyncio.to_thread(
-                        lambda: conn.execute(
-                            "SELECT MAX(detected_at), MAX(ended_at) FROM session_accounts"
-                        ).fetchone()
+                        lambda: conn.execute(_SESSION_CHANGE_SQL).fetchone()
                     )
-                    cur_detected = row[0] if row else None
+                    cur_id = row[0] if row else None
                     cur_ended = row[1] if row else None
-                    if cur_detected != last_max_detected or cur_ended != last_max_ended:
-                        last_max_detected = cur_detected
+                    if cur_id != last_max_id or cur_ended != last_max_ended:
+                        last_max_id = cur_id
                         last_max_ended = cur_ended
                         should_broadcast = True
 
@@ -10,6 +10,7 @@ events — only clients subscribed to a matching topic (or the wildcard
 0
 """
 
+import asyncio
 import json
 import logging
 import time
@@ -53,7 +54,8 @@ class WebSocketRegistry:
     ):
         """Send an event to all clients subscribed to *topic* or ``*``.
 
-        Dead clients (failed sends) are automatically pruned.
+        Sends go out concurrently; dead clients (failed sends) are
+        automatically pruned.
         """
         message = json.dumps(
             {
@@ -63,17 +65,17 @@ class WebSocketRegistry:
                 "timestamp": int(time.time()),
             }
         )
-        dead: list[WebSocket] = []
-        for ws in list(self._clients):
-            subs = self._clients[ws]
-            if "*" in subs or topic in subs:
-                try:
-                    await ws.send_text(message)
-                except Exception:
-                    dead.append(ws)
-        for ws in dead:
-            self._clients.pop(ws, None)
-            logger.debug("Pruned dead WebSocket client")
+        targets = [
+            ws for ws, subs in self._clients.items() if "*" in subs or topic in subs
+        ]
+        # Send concurrently so one slow client doesn't hold up the rest
+        results = await asyncio.gather(
+            *(ws.send_text(message) for ws in targets), return_exceptions=True
+        )
+        for ws, result in zip(targets, results):
+            if isinstance(result, Exception):
+                self._clients.pop(ws, None)
+                logger.debug("Pruned dead WebSocket client")
 
     @property
     def client_count(self) -> int:
@@ -12,9 +12,6 @@ from typing import Optional
 
 import click
 from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from jacked.config import SmartForkConfig, get_repo_id
 
@@ -127,6 +124,7 @@ def index(session: Optional[str], repo: Optional[str]):
     """
     import os
     import time
+    from rich.progress import Progress, SpinnerColumn, TextColumn
 
     _index_start = time.time()
 
@@ -253,6 +251,8 @@ def index(session: Optional[str], repo: Optional[str]):
 @click.option("--force", "-f", is_flag=True, help="Re-index all sessions")
 def backfill(repo: Optional[str], force: bool):
     """Index all existing Claude sessions. Requires: uv tool install "claude-jacked[search]" """
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+
     if not _require_search("backfill"):
         sys.exit(1)
 
@@ -310,6 +310,9 @@ def search(
 
     Requires: uv tool install "claude-jacked[search]"
     """
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from rich.table import Table
+
     if not _require_search("search"):
         sys.exit(1)
 
@@ -455,6 +458,9 @@ def retrieve(
 
     Requires: uv tool install "claude-jacked[search]"
     """
+    from rich.panel import Panel
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+
     if not _require_search("retrieve"):
         sys.exit(1)
 
@@ -540,6 +546,8 @@ def retrieve(
 @click.option("--limit", "-n", default=20, help="Maximum results")
 def list_sessions(repo: Optional[str], limit: int):
     """List indexed sessions. Requires: uv tool install "claude-jacked[search]" """
+    from rich.table import Table
+
     if not _require_search("sessions"):
         sys.exit(1)
 
@@ -605,6 +613,8 @@ def cleardb():
 
     Requires: uv tool install "claude-jacked[search]"
     """
+    from rich.panel import Panel
+
     if not _require_search("cleardb"):
         sys.exit(1)
 
@@ -651,6 +661,9 @@ def cleardb():
 @main.command()
 def status():
     """Show indexing health and Qdrant connectivity. Requires: uv tool install "claude-jacked[search]" """
+    from rich.panel import Panel
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+
     if not _require_search("status"):
         sys.exit(1)
 
@@ -818,6 +831,7 @@ def log(category, name, session_id, repo):
 def configure(show: bool):
     """Show configuration help or current settings."""
     import os
+    from rich.panel import Panel
 
     if show:
         # Show current config
@@ -2311,10 +2325,7 @@ def _classify_permission(pattern: str) -> tuple[str, str, str]:
     Returns (level, prefix, reason).
     level is 'WARN', 'INFO', or 'OK'.
     """
-    inner = pattern[5:]
-    if inner.endswith(")"):
-        inner = inner[:-1]
-    is_wildcard = inner.endswith(":*")
+    is_wildcard = pattern[5:].removesuffix(")").endswith(":*")
 
     prefix = _extract_prefix_from_pattern(pattern)
 
@@ -2362,27 +2373,66 @@ def _parse_log_for_perms_commands(log_path: Path, limit: int = 50) -> list[str]:
 
     Finds PERMS MATCH lines and extracts the command from the preceding EVALUATING line.
     Returns up to `limit` commands (most recent first).
-    """
-    if not log_path.exists():
-        return []
 
+    Reads the log backwards in doubling blocks and stops once the tail holds
+    `limit` matches, so a large log costs only its recent end.
+    """
+    commands: list[str] = []
     try:
-        lines = log_path.read_text(encoding="utf-8", errors="replace").splitlines()
+        with open(log_path, "rb") as f:
+            pos = f.seek(0, 2)
+            done = pos  # file offset where the already-parsed lines begin
+            data = b""
+            block = 64 * 1024
+            while pos > 0 and len(commands) < limit:
+                step = min(block, pos)
+                pos -= step
+                f.seek(pos)
+                data = f.read(step) + data
+                block *= 2
+
+                # Mid-file, the first line may be cut short — start after it
+                if pos == 0:
+                    base = 0
+                else:
+                    nl = data.find(b"\n")
+                    base = nl + 1 if nl != -1 else len(data)
+                stop = done - pos
+                done = pos + base
+
+                # Jump between PERMS MATCH hits with bytes.find — only the
+                # extracted commands are ever decoded
+                found = []
+                hit = data.find(b"PERMS MATCH", base, stop)
+                while hit != -1:
+                    nl = data.rfind(b"\n", base, hit)
+                    line_end = data.find(b"\n", hit, stop)
+                    end = nl + 1 if nl != -1 else base  # start of the hit's line
+                    # Look backwards (up to 4 lines) for the EVALUATING line
+                    for _ in range(4):
+                        if end == base:
+                            if pos > 0:
+                                # The look-back runs into unread data: retry this
+                                # hit next round; only later hits are final
+                                found.clear()
+                                done = pos + (line_end + 1 if line_end != -1 else stop)
+                            break
+                        nl = data.rfind(b"\n", base, end - 1)
+                        start = nl + 1 if nl != -1 else base
+                        idx = data.find(b"EVALUATING:", start, end - 1)
+                        if idx != -1:
+                            # Extract command after "EVALUATING: "
+                            cmd = data[idx + len(b"EVALUATING:") : end - 1]
+                            found.append(cmd.decode("utf-8", errors="replace").strip())
+                            break
+                        end = start
+                    if line_end == -1:
+                        break
+                    hit = data.find(b"PERMS MATCH", line_end, stop)
+                commands[:0] = found
     except Exception:
         return []
 
-    commands = []
-    for i, line in enumerate(lines):
-        if "PERMS MATCH" in line:
-            # Look backwards for the EVALUATING line
-            for j in range(i - 1, max(i - 5, -1), -1):
-                if "EVALUATING:" in lines[j]:
-                    # Extract command after "EVALUATING: "
-                    idx = lines[j].index("EVALUATING:") + len("EVALUATING:")
-                    cmd = lines[j][idx:].strip()
-                    commands.append(cmd)
-                    break
-
     # Return most recent N
     return commands[-limit:]
 
@@ -78,7 +78,7 @@ def check_version_cached(current_version: str, force: bool = False) -> dict | No
         if not force:
             try:
                 if VERSION_CACHE.exists():
-                    cache = json.loads(VERSION_CACHE.read_text(encoding="utf-8"))
+                    cache = json.loads(VERSION_CACHE.read_bytes())
                     checked_at = cache.get("checked_at", 0)
                     age = now - checked_at
                     if 0 <= age < CACHE_TTL:
@@ -352,9 +352,26 @@ CREATE INDEX IF NOT EXISTS idx_hook_executions_repo ON hook_executions(repo_path
 CREATE INDEX IF NOT EXISTS idx_sa_session ON session_accounts(session_id);
 CREATE INDEX IF NOT EXISTS idx_sa_account ON session_accounts(account_id);
 CREATE INDEX IF NOT EXISTS idx_sa_active ON session_accounts(ended_at, last_activity_at, detected_at);
+CREATE INDEX IF NOT EXISTS idx_sa_sid_tail ON session_accounts(lower(substr(session_id, -8)));
 CREATE INDEX IF NOT EXISTS idx_krt_account ON known_refresh_tokens(account_id);
 """
 
+# lookup_session_by_suffix: seek idx_sa_sid_tail on the last 8 characters,
+# then apply the escaped leading-wildcard LIKE to the rows it returns.
+# Params: (suffix, LIKE-escaped suffix, limit)
+_SUFFIX_LOOKUP_SQL = """SELECT session_id, account_id, email, repo_path,
+                              detected_at, ended_at,
+                              COALESCE(last_activity_at, detected_at) AS last_activity_at
+                       FROM session_accounts
+                       WHERE lower(substr(session_id, -8)) = lower(substr(?, -8))
+                         AND session_id LIKE '%' || ? ESCAPE '\\'
+                       ORDER BY detected_at DESC
+                       LIMIT ?"""
+
+# Stored in PRAGMA user_version once _init_schema's migrations have run.
+# Bump it whenever a migration is added there.
+SCHEMA_VERSION = 1
+
 
 def _default_db_path() -> str:
     """Return default database path: ~/.claude/jacked.db"""
@@ -392,6 +409,8 @@ class Database:
         if not hasattr(self._local, "connection") or self._local.connection is None:
             conn = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False)
             conn.execute("PRAGMA journal_mode=WAL")
+            # NORMAL is crash-safe under WAL and skips the fsync on every commit
+            conn.execute("PRAGMA synchronous=NORMAL")
             conn.execute("PRAGMA foreign_keys=ON")
             conn.row_factory = sqlite3.Row
             self._local.connection = conn
@@ -415,61 +434,74 @@ class Database:
     def _init_schema(self) -> None:
         with self._writer() as conn:
             conn.executescript(SCHEMA_SQL)
-            # Migrations run BEFORE indexes (indexes may reference new columns)
-            # Migration: add cached_usage_raw if missing (existing DBs)
-            cursor = conn.execute("PRAGMA table_info(accounts)")
-            cols = {row[1] for row in cursor.fetchall()}
-            if "cached_usage_raw" not in cols:
-                try:
-                    conn.execute(
-                        "ALTER TABLE accounts ADD COLUMN cached_usage_raw TEXT"
-                    )
-                except sqlite3.OperationalError:
-                    pass  # another worker beat us to it
-            # Migration: add env_path to installations
-            cursor = conn.execute("PRAGMA table_info(installations)")
-            cols = {row[1] for row in cursor.fetchall()}
-            if "env_path" not in cols:
-                try:
-                    conn.execute("ALTER TABLE installations ADD COLUMN env_path TEXT")
-                except sqlite3.OperationalError:
-                    pass
-            # Migration: add last_activity_at to session_accounts
-            cursor = conn.execute("PRAGMA table_info(session_accounts)")
-            cols = {row[1] for row in cursor.fetchall()}
-            if "last_activity_at" not in cols:
-                try:
-                    conn.execute(
-                        "ALTER TABLE session_accounts ADD COLUMN last_activity_at TEXT"
-                    )
-                except sqlite3.OperationalError:
-                    pass
-            # Migration: add subagent tracking columns to session_accounts
-            cursor = conn.execute("PRAGMA table_info(session_accounts)")
-            cols = {row[1] for row in cursor.fetchall()}
-            for col_name, col_def in [
-                ("is_subagent", "BOOLEAN DEFAULT 0"),
-                ("parent_session_id", "TEXT"),
-                ("agent_type", "TEXT"),
-            ]:
-                if col_name not in cols:
+            # Column and index migrations are gated on user_version so an
+            # up-to-date DB skips the PRAGMA table_info probes entirely
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < SCHEMA_VERSION:
+                # Migrations run BEFORE indexes (indexes may reference new columns)
+                # Migration: add cached_usage_raw if missing (existing DBs)
+                cursor = conn.execute("PRAGMA table_info(accounts)")
+                cols = {row[1] for row in cursor.fetchall()}
+                if "cached_usage_raw" not in cols:
+                    try:
+                        conn.execute(
+                            "ALTER TABLE accounts ADD COLUMN cached_usage_raw TEXT"
+                        )
+                    except sqlite3.OperationalError:
+                        pass  # another worker beat us to it
+                # Migration: add env_path to installations
+                cursor = conn.execute("PRAGMA table_info(installations)")
+                cols = {row[1] for row in cursor.fetchall()}
+                if "env_path" not in cols:
+                    try:
+                        conn.execute("ALTER TABLE installations ADD COLUMN env_path TEXT")
+                    except sqlite3.OperationalError:
+                        pass
+                # Migration: add last_activity_at to session_accounts
+                cursor = conn.execute("PRAGMA table_info(session_accounts)")
+                cols = {row[1] for row in cursor.fetchall()}
+                if "last_activity_at" not in cols:
                     try:
                         conn.execute(
-                            f"ALTER TABLE session_accounts ADD COLUMN {col_name} {col_def}"
+                            "ALTER TABLE session_accounts ADD COLUMN last_activity_at TEXT"
                         )
                     except sqlite3.OperationalError:
                         pass
+                # Migration: add subagent tracking columns to session_accounts
+                cursor = conn.execute("PRAGMA table_info(session_accounts)")
+                cols = {row[1] for row in cursor.fetchall()}
+                for col_name, col_def in [
+                    ("is_subagent", "BOOLEAN DEFAULT 0"),
+                    ("parent_session_id", "TEXT"),
+                    ("agent_type", "TEXT"),
+                ]:
+                    if col_name not in cols:
+                        try:
+                            conn.execute(
+                                f"ALTER TABLE session_accounts ADD COLUMN {col_name} {col_def}"
+                            )
+                        except sqlite3.OperationalError:
+                            pass
             # Indexes (after migrations so new columns exist)
             conn.executescript(INDEXES_SQL)
-            # Migration: rebuild idx_sa_active to cover last_activity_at
-            try:
-                conn.execute("DROP INDEX IF EXISTS idx_sa_active")
-                conn.execute(
-                    "CREATE INDEX IF NOT EXISTS idx_sa_active "
-                    "ON session_accounts(ended_at, last_activity_at, detected_at)"
-                )
-            except sqlite3.OperationalError:
-                pass
+            if version < SCHEMA_VERSION:
+                # Migration: rebuild idx_sa_active to cover last_activity_at.
+                # Only when the old definition is still there — rebuilding on
+                # every startup re-sorts the whole table.
+                try:
+                    row = conn.execute(
+                        "SELECT sql FROM sqlite_master "
+                        "WHERE type = 'index' AND name = 'idx_sa_active'"
+                    ).fetchone()
+                    if row is None or "last_activity_at" not in row[0]:
+                        conn.execute("DROP INDEX IF EXISTS idx_sa_active")
+                        conn.execute(
+                            "CREATE INDEX IF NOT EXISTS idx_sa_active "
+                            "ON session_accounts(ended_at, last_activity_at, detected_at)"
+                        )
+                except sqlite3.OperationalError:
+                    pass
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
             # Migration: seed known_refresh_tokens from existing accounts
             try:
                 conn.execute(
@@ -1592,12 +1624,12 @@ class Database:
         ts = datetime.now(timezone.utc).isoformat()
         with self._writer() as conn:
             # End any open records for this session under a DIFFERENT account
-            # (account_id != ? doesn't match NULLs, so OR account_id IS NULL)
+            # (IS NOT is the NULL-safe !=, so unattributed rows close too)
             if account_id is not None:
                 conn.execute(
                     """UPDATE session_accounts SET ended_at = ?
                        WHERE session_id = ? AND ended_at IS NULL
-                         AND (account_id != ? OR account_id IS NULL)""",
+                         AND account_id IS NOT ?""",
                     (ts, session_id, account_id),
                 )
 
@@ -1867,7 +1899,9 @@ class Database:
         """Find session-account records by session_id suffix.
 
         Requires at least 8 characters. LIKE wildcards in the suffix
-        are escaped to prevent broad matches.
+        are escaped to prevent broad matches. The last 8 characters are
+        matched through idx_sa_sid_tail first, so the leading-wildcard
+        LIKE only runs on the rows that seek returns.
 
         >>> db = Database(":memory:")
         >>> db.lookup_session_by_suffix("short")
@@ -1882,16 +1916,7 @@ class Database:
         # Escape LIKE wildcards — backslash first to avoid double-escaping
         safe = suffix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
         with self._reader() as conn:
-            cursor = conn.execute(
-                """SELECT session_id, account_id, email, repo_path,
-                          detected_at, ended_at,
-                          COALESCE(last_activity_at, detected_at) AS last_activity_at
-                   FROM session_accounts
-                   WHERE session_id LIKE '%' || ? ESCAPE '\\'
-                   ORDER BY detected_at DESC
-                   LIMIT ?""",
-                (safe, limit),
-            )
+            cursor = conn.execute(_SUFFIX_LOOKUP_SQL, (suffix, safe, limit))
             return [dict(row) for row in cursor.fetchall()]
 
     # ==================================================================
@@ -1910,36 +1935,42 @@ class Database:
         0
         """
         with self._reader() as conn:
-            cutoff = f"datetime('now', '-{days} days')"
+            # Bound ISO cutoff — stored timestamps are isoformat() strings
+            cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
 
             cursor = conn.execute(
-                f"SELECT COUNT(*) as total FROM gatekeeper_decisions WHERE timestamp >= {cutoff}"
+                "SELECT COUNT(*) as total FROM gatekeeper_decisions WHERE timestamp >= ?",
+                (cutoff,),
             )
             total = cursor.fetchone()["total"]
 
             cursor = conn.execute(
-                f"""SELECT decision, COUNT(*) as count
-                    FROM gatekeeper_decisions WHERE timestamp >= {cutoff}
-                    GROUP BY decision"""
+                """SELECT decision, COUNT(*) as count
+                    FROM gatekeeper_decisions WHERE timestamp >= ?
+                    GROUP BY decision""",
+                (cutoff,),
             )
             by_decision = {row["decision"]: row["count"] for row in cursor.fetchall()}
 
             cursor = conn.execute(
-                f"""SELECT method, COUNT(*) as count
-                    FROM gatekeeper_decisions WHERE timestamp >= {cutoff}
-                    GROUP BY method"""
+                """SELECT method, COUNT(*) as count
+                    FROM gatekeeper_decisions WHERE timestamp >= ?
+                    GROUP BY method""",
+                (cutoff,),
             )
             by_method = {row["method"]: row["count"] for row in cursor.fetchall()}
 
             cursor = conn.execute(
-                f"SELECT AVG(elapsed_ms) as avg_ms FROM gatekeeper_decisions WHERE timestamp >= {cutoff}"
+                "SELECT AVG(elapsed_ms) as avg_ms FROM gatekeeper_decisions WHERE timestamp >= ?",
+                (cutoff,),
             )
             avg_ms = cursor.fetchone()["avg_ms"]
 
             cursor = conn.execute(
-                f"""SELECT * FROM gatekeeper_decisions
-                    WHERE timestamp >= {cutoff}
-                    ORDER BY timestamp DESC LIMIT 50"""
+                """SELECT * FROM gatekeeper_decisions
+                    WHERE timestamp >= ?
+                    ORDER BY timestamp DESC LIMIT 50""",
+                (cutoff,),
             )
             recent = [dict(row) for row in cursor.fetchall()]
 
@@ -1960,19 +1991,22 @@ class Database:
         0
         """
         with self._reader() as conn:
-            cutoff = f"datetime('now', '-{days} days')"
+            # Bound ISO cutoff — stored timestamps are isoformat() strings
+            cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
 
             cursor = conn.execute(
-                f"SELECT COUNT(*) as total FROM command_usage WHERE timestamp >= {cutoff}"
+                "SELECT COUNT(*) as total FROM command_usage WHERE timestamp >= ?",
+                (cutoff,),
             )
             total = cursor.fetchone()["total"]
 
             cursor = conn.execute(
-                f"""SELECT command_name, COUNT(*) as count,
+                """SELECT command_name, COUNT(*) as count,
                            SUM(CASE WHEN success = 1 THEN 1 ELSE 0 END) as successes,
                            AVG(duration_ms) as avg_ms
-                    FROM command_usage WHERE timestamp >= {cutoff}
-                    GROUP BY command_name ORDER BY count DESC"""
+                    FROM command_usage WHERE timestamp >= ?
+                    GROUP BY command_name ORDER BY count DESC""",
+                (cutoff,),
             )
             by_command = [
                 {
@@ -1999,21 +2033,24 @@ class Database:
         0
         """
         with self._reader() as conn:
-            cutoff = f"datetime('now', '-{days} days')"
+            # Bound ISO cutoff — stored timestamps are isoformat() strings
+            cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
 
             cursor = conn.execute(
-                f"SELECT COUNT(*) as total FROM agent_invocations WHERE timestamp >= {cutoff}"
+                "SELECT COUNT(*) as total FROM agent_invocations WHERE timestamp >= ?",
+                (cutoff,),
             )
             total = cursor.fetchone()["total"]
 
             cursor = conn.execute(
-                f"""SELECT agent_name, COUNT(*) as count,
+                """SELECT agent_name, COUNT(*) as count,
                            SUM(CASE WHEN success = 1 THEN 1 ELSE 0 END) as successes,
                            AVG(duration_ms) as avg_ms,
                            SUM(tasks_completed) as total_tasks,
                            SUM(errors) as total_errors
-                    FROM agent_invocations WHERE timestamp >= {cutoff}
-                    GROUP BY agent_name ORDER BY count DESC"""
+                    FROM agent_invocations WHERE timestamp >= ?
+                    GROUP BY agent_name ORDER BY count DESC""",
+                (cutoff,),
             )
             by_agent = [
                 {
@@ -2042,19 +2079,22 @@ class Database:
         0
         """
         with self._reader() as conn:
-            cutoff = f"datetime('now', '-{days} days')"
+            # Bound ISO cutoff — stored timestamps are isoformat() strings
+            cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
 
             cursor = conn.execute(
-                f"SELECT COUNT(*) as total FROM hook_executions WHERE timestamp >= {cutoff}"
+                "SELECT COUNT(*) as total FROM hook_executions WHERE timestamp >= ?",
+                (cutoff,),
             )
             total = cursor.fetchone()["total"]
 
             cursor = conn.execute(
-                f"""SELECT hook_name, hook_type, COUNT(*) as count,
+                """SELECT hook_name, hook_type, COUNT(*) as count,
                            SUM(CASE WHEN success = 1 THEN 1 ELSE 0 END) as successes,
                            AVG(duration_ms) as avg_ms
-                    FROM hook_executions WHERE timestamp >= {cutoff}
-                    GROUP BY hook_name, hook_type ORDER BY count DESC"""
+                    FROM hook_executions WHERE timestamp >= ?
+                    GROUP BY hook_name, hook_type ORDER BY count DESC""",
+                (cutoff,),
             )
             by_hook = [
                 {
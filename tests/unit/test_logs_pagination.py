@@ -1,10 +1,13 @@
 """Unit tests for paginated log list methods.
 
 Covers list_gatekeeper_decisions, list_hook_executions, list_version_checks
-with offset, total count, and server-side filters.
+with offset, total count, and server-side filters, plus the day window of
+the query_* analytics over the same tables.
 """
 
 import time
+from datetime import datetime, timedelta, timezone
+
 from jacked.web.database import Database
 
 
@@ -381,3 +384,29 @@ def test_version_checks_pagination():
     r = db.list_version_checks(limit=2, offset=4)
     assert r["total"] == 5
     assert len(r["rows"]) == 1
+
+
+# ------------------------------------------------------------------
+# query_* analytics — day window
+# ------------------------------------------------------------------
+
+
+def test_query_window_excludes_rows_just_past_cutoff():
+    """A row one minute older than the window is excluded, even on the cutoff day.
+
+    >>> # Verified via unit test
+    """
+    db = _make_db()
+    now = datetime.now(timezone.utc)
+    with db._writer() as conn:
+        for ts in (now - timedelta(days=1, minutes=1), now - timedelta(hours=1)):
+            conn.execute(
+                """INSERT INTO gatekeeper_decisions
+                   (timestamp, command, decision, method)
+                   VALUES (?, 'ls', 'ALLOW', 'LOCAL')""",
+                (ts.isoformat(),),
+            )
+
+    stats = db.query_gatekeeper_decisions(days=1)
+    assert stats["total"] == 1
+    assert len(stats["recent"]) == 1
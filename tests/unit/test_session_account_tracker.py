@@ -4,133 +4,115 @@ Tests keychain fallback in _get_cred_data(), removal of the short-circuit
 in _handle_event(), and _match_token_to_account accepting None token.
 """
 
+import io
 import json
-import sys
-import tempfile
+import subprocess
 from pathlib import Path
+from types import SimpleNamespace
 from unittest import mock
 
-# The hook is a standalone script — import its functions directly
-sys.path.insert(
-    0,
-    str(Path(__file__).parent.parent.parent / "jacked" / "data" / "hooks"),
-)
-import session_account_tracker as sat  # noqa: E402
+import pytest
 
+# The hook is stdlib-only, so the package import gives the same module the
+# other tracker tests patch — no sys.path entry, no second copy
+from jacked.data.hooks import session_account_tracker as sat
 
-# ------------------------------------------------------------------
-# _get_cred_data: file + keychain fallback
-# ------------------------------------------------------------------
+_MISSING_CRED_PATH = Path("/nonexistent/.credentials.json")
+_MISSING_DB_PATH = Path("/nonexistent/jacked.db")
 
 
-def test_get_cred_data_file_exists():
-    """Reads from credential file when it exists.
+@pytest.fixture
+def sat_mocks(monkeypatch):
+    """Replace _handle_event's collaborators with MagicMocks.
 
-    >>> test_get_cred_data_file_exists()
+    Plain setattr via monkeypatch — one fixture instead of a stack of
+    mock.patch.object contexts per test. Tests set return values as needed.
     """
-    with tempfile.TemporaryDirectory() as tmp:
-        cred_path = Path(tmp) / ".credentials.json"
-        data = {
-            "claudeAiOauth": {"accessToken": "file_token"},
-            "_jackedAccountId": 1,
-        }
-        cred_path.write_text(json.dumps(data), encoding="utf-8")
-
-        with mock.patch.object(sat, "CRED_PATH", cred_path):
-            token, result = sat._get_cred_data()
-
-        assert token == "file_token"
-        assert result["_jackedAccountId"] == 1
+    mocks = SimpleNamespace(
+        get_cred_data=mock.MagicMock(return_value=(None, None)),
+        match=mock.MagicMock(return_value=(None, None)),
+        record=mock.MagicMock(return_value="ts"),
+        tag_subagent=mock.MagicMock(),
+        clear_error=mock.MagicMock(),
+        end=mock.MagicMock(),
+        heartbeat=mock.MagicMock(),
+    )
+    monkeypatch.setattr(sat, "_get_cred_data", mocks.get_cred_data)
+    monkeypatch.setattr(sat, "_match_token_to_account", mocks.match)
+    monkeypatch.setattr(sat, "_record_session", mocks.record)
+    monkeypatch.setattr(sat, "_tag_subagent", mocks.tag_subagent)
+    monkeypatch.setattr(sat, "_clear_account_error", mocks.clear_error)
+    monkeypatch.setattr(sat, "_end_session", mocks.end)
+    monkeypatch.setattr(sat, "_heartbeat_session", mocks.heartbeat)
+    return mocks
+
+
+@pytest.fixture
+def main_harness(monkeypatch):
+    """Run sat.main() on a stdin payload with _handle_event and Thread mocked.
+
+    Call ``main_harness.run(raw)``; ``main_harness.thread`` is the mocked
+    threading.Thread class.
+    """
+    harness = SimpleNamespace(handle=mock.MagicMock(), thread=mock.MagicMock())
+    monkeypatch.setattr(sat, "_handle_event", harness.handle)
+    monkeypatch.setattr(sat.threading, "Thread", harness.thread)
 
+    def run(raw):
+        monkeypatch.setattr(sat.sys, "stdin", io.StringIO(raw))
+        sat.main()
 
-def test_get_cred_data_file_missing_keychain_fallback():
-    """Falls back to macOS Keychain when file doesn't exist.
+    harness.run = run
+    return harness
 
-    >>> test_get_cred_data_file_missing_keychain_fallback()
-    """
-    keychain_json = json.dumps({
-        "claudeAiOauth": {"accessToken": "keychain_token"},
-    })
-    mock_result = mock.MagicMock()
-    mock_result.returncode = 0
-    mock_result.stdout = keychain_json
-
-    fake_path = Path("/nonexistent/.credentials.json")
-    with (
-        mock.patch.object(sat, "CRED_PATH", fake_path),
-        mock.patch.object(sat, "sys") as mock_sys,
-        mock.patch("subprocess.run", return_value=mock_result),
-    ):
-        mock_sys.platform = "darwin"
-        mock_sys.stderr = sys.stderr
-        token, data = sat._get_cred_data()
-
-    assert token == "keychain_token"
-    assert data is not None
-
-
-def test_get_cred_data_file_missing_linux():
-    """Returns (None, None) on Linux when file is missing (no keychain).
-
-    >>> test_get_cred_data_file_missing_linux()
-    """
-    fake_path = Path("/nonexistent/.credentials.json")
-    with (
-        mock.patch.object(sat, "CRED_PATH", fake_path),
-        mock.patch.object(sat, "sys") as mock_sys,
-    ):
-        mock_sys.platform = "linux"
-        token, data = sat._get_cred_data()
 
-    assert token is None
-    assert data is None
+# ------------------------------------------------------------------
+# _get_cred_data: file + keychain fallback
+# ------------------------------------------------------------------
 
 
-def test_get_cred_data_keychain_locked():
-    """Returns (None, None) when keychain is locked (non-zero exit).
+def test_get_cred_data_file_exists(tmp_path):
+    """Reads from credential file when it exists."""
+    cred_path = tmp_path / ".credentials.json"
+    data = {
+        "claudeAiOauth": {"accessToken": "file_token"},
+        "_jackedAccountId": 1,
+    }
+    cred_path.write_text(json.dumps(data), encoding="utf-8")
 
-    >>> test_get_cred_data_keychain_locked()
-    """
-    mock_result = mock.MagicMock()
-    mock_result.returncode = 36  # user denied access
-    mock_result.stdout = ""
-    mock_result.stderr = "User denied access"
+    with mock.patch.object(sat, "CRED_PATH", cred_path):
+        token, result = sat._get_cred_data()
 
-    fake_path = Path("/nonexistent/.credentials.json")
-    with (
-        mock.patch.object(sat, "CRED_PATH", fake_path),
-        mock.patch.object(sat, "sys") as mock_sys,
-        mock.patch("subprocess.run", return_value=mock_result),
-    ):
-        mock_sys.platform = "darwin"
-        mock_sys.stderr = sys.stderr
-        token, data = sat._get_cred_data()
+    assert token == "file_token"
+    assert result["_jackedAccountId"] == 1
 
-    assert token is None
-    assert data is None
 
+_KEYCHAIN_JSON = json.dumps({"claudeAiOauth": {"accessToken": "keychain_token"}})
 
-def test_get_cred_data_keychain_malformed():
-    """Returns (None, None) when keychain returns invalid JSON.
 
-    >>> test_get_cred_data_keychain_malformed()
-    """
-    mock_result = mock.MagicMock()
-    mock_result.returncode = 0
-    mock_result.stdout = "not-json{{"
+@pytest.mark.parametrize(
+    "platform, returncode, stdout, expected_token",
+    [
+        ("darwin", 0, _KEYCHAIN_JSON, "keychain_token"),
+        ("linux", 0, _KEYCHAIN_JSON, None),  # no keychain off macOS
+        ("darwin", 36, "", None),  # user denied access / keychain locked
+        ("darwin", 0, "not-json{{", None),
+    ],
+    ids=["keychain_fallback", "linux", "keychain_locked", "keychain_malformed"],
+)
+def test_get_cred_data_file_missing(
+    monkeypatch, platform, returncode, stdout, expected_token
+):
+    """A missing file falls back to the Keychain on macOS only; failures give (None, None)."""
+    result = subprocess.CompletedProcess([], returncode, stdout=stdout, stderr="")
+    monkeypatch.setattr(sat, "CRED_PATH", _MISSING_CRED_PATH)
+    monkeypatch.setattr(sat.sys, "platform", platform)
+    monkeypatch.setattr(subprocess, "run", lambda *args, **kwargs: result)
 
-    fake_path = Path("/nonexistent/.credentials.json")
-    with (
-        mock.patch.object(sat, "CRED_PATH", fake_path),
-        mock.patch.object(sat, "sys") as mock_sys,
-        mock.patch("subprocess.run", return_value=mock_result),
-    ):
-        mock_sys.platform = "darwin"
-        mock_sys.stderr = sys.stderr
-        token, data = sat._get_cred_data()
+    token, data = sat._get_cred_data()
 
-    assert token is None
-    assert data is None
+    assert token == expected_token
+    assert (data is not None) == (expected_token is not None)
 
 
 # ------------------------------------------------------------------
@@ -139,12 +121,9 @@ def test_get_cred_data_keychain_malformed():
 
 
 def test_match_token_accepts_none():
-    """_match_token_to_account(None, None) doesn't crash.
-
-    >>> test_match_token_accepts_none()
-    """
-    # Uses the real DB path — but if DB doesn't exist, returns (None, None)
-    with mock.patch.object(sat, "DB_PATH", Path("/nonexistent/jacked.db")):
+    """_match_token_to_account(None, None) doesn't crash."""
+    # No DB at DB_PATH, so the lookup falls through to (None, None)
+    with mock.patch.object(sat, "DB_PATH", _MISSING_DB_PATH):
         account_id, email = sat._match_token_to_account(None, None)
 
     assert account_id is None
@@ -156,63 +135,33 @@ def test_match_token_accepts_none():
 # ------------------------------------------------------------------
 
 
-def test_handle_event_always_calls_match():
-    """_handle_event always calls _match_token_to_account, even with no token.
+def test_handle_event_always_calls_match(sat_mocks):
+    """_handle_event always calls _match_token_to_account, even with no token."""
+    sat._handle_event("SessionStart", "test-sess", "/repo")
 
-    >>> test_handle_event_always_calls_match()
-    """
-    with (
-        mock.patch.object(sat, "_get_cred_data", return_value=(None, None)),
-        mock.patch.object(
-            sat, "_match_token_to_account", return_value=(None, None)
-        ) as mock_match,
-        mock.patch.object(sat, "_record_session", return_value="2025-01-01T00:00:00Z"),
-        mock.patch.object(sat, "_tag_subagent"),
-    ):
-        sat._handle_event("SessionStart", "test-sess", "/repo")
+    sat_mocks.match.assert_called_once_with(None, None)
 
-    mock_match.assert_called_once_with(None, None)
 
+def test_handle_event_no_token_uses_layer3(sat_mocks):
+    """Even without a token, _match_token_to_account is called for Layer 3."""
+    sat_mocks.match.return_value = (42, "user@test.com")
 
-def test_handle_event_no_token_uses_layer3():
-    """Even without a token, _match_token_to_account is called for Layer 3.
+    sat._handle_event("SessionStart", "test-sess", "/repo")
 
-    >>> test_handle_event_no_token_uses_layer3()
-    """
-    with (
-        mock.patch.object(sat, "_get_cred_data", return_value=(None, None)),
-        mock.patch.object(
-            sat, "_match_token_to_account", return_value=(42, "user@test.com")
-        ) as mock_match,
-        mock.patch.object(sat, "_record_session", return_value="ts") as mock_record,
-        mock.patch.object(sat, "_tag_subagent"),
-        mock.patch.object(sat, "_clear_account_error") as mock_clear,
-    ):
-        sat._handle_event("SessionStart", "test-sess", "/repo")
-
-    mock_match.assert_called_once_with(None, None)
-    mock_record.assert_called_once_with("test-sess", 42, "user@test.com", "session_start", "/repo")
-    mock_clear.assert_called_once_with(42)
-
-
-def test_handle_event_notification_closes_old_session():
-    """Notification event closes old session then records new one.
-
-    >>> test_handle_event_notification_closes_old_session()
-    """
-    with (
-        mock.patch.object(sat, "_get_cred_data", return_value=("tok", {"claudeAiOauth": {}})),
-        mock.patch.object(
-            sat, "_match_token_to_account", return_value=(1, "a@test.com")
-        ),
-        mock.patch.object(sat, "_end_session") as mock_end,
-        mock.patch.object(sat, "_record_session") as mock_record,
-        mock.patch.object(sat, "_clear_account_error"),
-    ):
-        sat._handle_event("Notification", "test-sess", "/repo")
+    sat_mocks.match.assert_called_once_with(None, None)
+    sat_mocks.record.assert_called_once_with("test-sess", 42, "user@test.com", "session_start", "/repo")
+    sat_mocks.clear_error.assert_called_once_with(42)
+
+
+def test_handle_event_notification_closes_old_session(sat_mocks):
+    """Notification event closes old session then records new one."""
+    sat_mocks.get_cred_data.return_value = ("tok", {"claudeAiOauth": {}})
+    sat_mocks.match.return_value = (1, "a@test.com")
+
+    sat._handle_event("Notification", "test-sess", "/repo")
 
-    mock_end.assert_called_once_with("test-sess")
-    mock_record.assert_called_once_with("test-sess", 1, "a@test.com", "auth_success", "/repo")
+    sat_mocks.end.assert_called_once_with("test-sess")
+    sat_mocks.record.assert_called_once_with("test-sess", 1, "a@test.com", "auth_success", "/repo")
 
 
 # ------------------------------------------------------------------
@@ -220,45 +169,41 @@ def test_handle_event_notification_closes_old_session():
 # ------------------------------------------------------------------
 
 
-def test_user_prompt_submit_triggers_heartbeat():
-    """UserPromptSubmit calls _heartbeat_session, not _record_session or _get_cred_data.
+def test_user_prompt_submit_triggers_heartbeat(sat_mocks):
+    """UserPromptSubmit calls _heartbeat_session, not _record_session or _get_cred_data."""
+    sat._handle_event("UserPromptSubmit", "test-sess", "/repo")
 
-    >>> test_user_prompt_submit_triggers_heartbeat()
-    """
-    with (
-        mock.patch.object(sat, "_heartbeat_session") as mock_hb,
-        mock.patch.object(sat, "_get_cred_data") as mock_cred,
-        mock.patch.object(sat, "_record_session") as mock_record,
-    ):
-        sat._handle_event("UserPromptSubmit", "test-sess", "/repo")
-
-    mock_hb.assert_called_once_with("test-sess")
-    mock_cred.assert_not_called()
-    mock_record.assert_not_called()
+    sat_mocks.heartbeat.assert_called_once_with("test-sess")
+    sat_mocks.get_cred_data.assert_not_called()
+    sat_mocks.record.assert_not_called()
 
 
-def test_user_prompt_submit_passes_main_event_filter():
-    """main() allows UserPromptSubmit through its event allowlist.
-
-    >>> test_user_prompt_submit_passes_main_event_filter()
-    """
-    input_data = json.dumps({
+def test_user_prompt_submit_passes_main_event_filter(main_harness):
+    """main() allows UserPromptSubmit through its event allowlist."""
+    main_harness.run(json.dumps({
         "hook_event_name": "UserPromptSubmit",
         "session_id": "sess-ups-001",
         "cwd": "/test/project",
-    })
-    with (
-        mock.patch.object(sat, "sys") as mock_sys,
-        mock.patch.object(sat, "_handle_event") as mock_handle,
-        mock.patch("threading.Thread") as mock_thread,
-    ):
-        mock_sys.stdin.read.return_value = input_data
-        mock_thread_instance = mock.MagicMock()
-        mock_thread.return_value = mock_thread_instance
+    }))
 
-        sat.main()
-
-    mock_thread.assert_called_once()
-    call_args = mock_thread.call_args
+    main_harness.thread.assert_called_once()
+    call_args = main_harness.thread.call_args
     assert call_args[1]["args"] == ("UserPromptSubmit", "sess-ups-001", "/test/project")
-    mock_thread_instance.start.assert_called_once()
+    main_harness.thread.return_value.start.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        "",
+        "not-json{{",
+        json.dumps({"hook_event_name": "PreToolUse", "session_id": "sess-1"}),
+        json.dumps({"hook_event_name": "SessionStart"}),
+    ],
+    ids=["empty", "malformed", "other_event", "no_session_id"],
+)
+def test_main_ignores_input_without_dispatch(main_harness, raw):
+    """main() returns without starting a thread for input it doesn't handle."""
+    main_harness.run(raw)
+
+    main_harness.thread.assert_not_called()
@@ -8,12 +8,12 @@ and subagent session detection/tagging.
 """
 
 import asyncio
-import os
 import sqlite3
-import time
 from datetime import datetime, timezone, timedelta
 
-from jacked.web.database import Database
+import pytest
+
+from jacked.web.database import SCHEMA_VERSION, Database
 from jacked.data.hooks.session_account_tracker import (
     _detect_subagent,
     _tag_subagent,
@@ -30,6 +30,28 @@ def _make_db():
     return Database(":memory:")
 
 
+@pytest.fixture
+def monotonic_clock(monkeypatch):
+    """Make the Database's datetime.now() strictly increasing.
+
+    Back-to-back records on the same session can otherwise share a
+    detected_at on coarse clocks, and INSERT OR IGNORE under
+    UNIQUE(session_id, detected_at) would drop the second one.
+    """
+    last = []
+
+    class _MonotonicDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            now = datetime.now(tz)
+            if last and now <= last[0]:
+                now = last[0] + timedelta(microseconds=1)
+            last[:] = [now]
+            return now
+
+    monkeypatch.setattr("jacked.web.database.datetime", _MonotonicDatetime)
+
+
 # ------------------------------------------------------------------
 # record_session_account
 # ------------------------------------------------------------------
@@ -94,8 +116,6 @@ def test_record_session_account_dedup():
     db = _make_db()
     r1 = db.record_session_account("s1", account_id=1, email="a@b.com")
     assert r1 > 0
-
-    time.sleep(0.01)
     r2 = db.record_session_account("s1", account_id=1, email="a@b.com")
     assert r2 > 0
 
@@ -171,7 +191,7 @@ def test_end_session_account_idempotent():
     assert db.end_session_account("s1") is False  # Already ended
 
 
-def test_end_session_account_auth_reauth_flow():
+def test_end_session_account_auth_reauth_flow(monotonic_clock):
     """Simulate auth_success flow: end previous, record new, end again.
 
     >>> # Verified via unit test
@@ -185,7 +205,6 @@ def test_end_session_account_auth_reauth_flow():
 
     # Auth success — end old record, create new one
     db.end_session_account("s1")
-    time.sleep(0.01)
     db.record_session_account(
         "s1", account_id=2, email="new@b.com", detection_method="auth_success"
     )
@@ -260,9 +279,7 @@ def test_get_active_sessions_multiple_accounts():
     """
     db = _make_db()
     db.record_session_account("s1", account_id=1, email="a@b.com", repo_path="/repo/a")
-    time.sleep(0.01)
     db.record_session_account("s2", account_id=1, email="a@b.com", repo_path="/repo/b")
-    time.sleep(0.01)
     db.record_session_account("s3", account_id=2, email="c@d.com", repo_path="/repo/c")
 
     active = db.get_active_sessions()
@@ -376,7 +393,6 @@ def test_get_account_sessions_limit():
     """
     db = _make_db()
     for i in range(5):
-        time.sleep(0.01)
         db.record_session_account(f"s{i}", account_id=1, email="a@b.com")
 
     assert len(db.get_account_sessions(1, limit=3)) == 3
@@ -417,7 +433,7 @@ def test_sqlite_check_same_thread_false():
             lambda: conn.execute("SELECT val FROM t WHERE id = 1").fetchone()[0]
         )
 
-    result = asyncio.new_event_loop().run_until_complete(_query_in_thread())
+    result = asyncio.run(_query_in_thread())
     assert result == "hello"
     conn.close()
 
@@ -437,17 +453,56 @@ def test_sqlite_pragma_data_version_in_thread():
             lambda: conn.execute("PRAGMA data_version").fetchone()[0]
         )
 
-    dv = asyncio.new_event_loop().run_until_complete(_read_data_version())
+    dv = asyncio.run(_read_data_version())
     assert isinstance(dv, int)
     conn.close()
 
 
+def test_session_change_query_seeks_and_tracks_changes():
+    """The watcher's change query uses index seeks and moves on insert and end.
+
+    >>> # Verified via unit test
+    """
+    from jacked.api.watchers import _SESSION_CHANGE_SQL
+
+    db = _make_db()
+    with db._reader() as conn:
+        plan = [row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + _SESSION_CHANGE_SQL)]
+        assert not any(step.startswith("SCAN session_accounts") for step in plan)
+        empty = tuple(conn.execute(_SESSION_CHANGE_SQL).fetchone())
+
+    db.record_session_account("s1", account_id=1, email="a@b.com")
+    with db._reader() as conn:
+        inserted = tuple(conn.execute(_SESSION_CHANGE_SQL).fetchone())
+
+    db.heartbeat_session("s1")
+    with db._reader() as conn:
+        assert tuple(conn.execute(_SESSION_CHANGE_SQL).fetchone()) == inserted
+
+    db.end_session_account("s1")
+    with db._reader() as conn:
+        ended = tuple(conn.execute(_SESSION_CHANGE_SQL).fetchone())
+
+    assert empty != inserted != ended
+
+
+def test_file_db_connection_pragmas(tmp_path):
+    """A file-backed Database connects in WAL mode with synchronous=NORMAL.
+
+    >>> # Verified via unit test
+    """
+    db = Database(str(tmp_path / "jacked.db"))
+    with db._reader() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+
 # ------------------------------------------------------------------
 # heartbeat_session
 # ------------------------------------------------------------------
 
 
-def test_heartbeat_session_basic():
+def test_heartbeat_session_basic(monotonic_clock):
     """Heartbeat updates last_activity_at for an active session.
 
     >>> db = _make_db()
@@ -461,8 +516,6 @@ def test_heartbeat_session_basic():
     # Record the initial last_activity_at
     rows = db.get_session_accounts("s1")
     initial_ts = rows[0].get("last_activity_at") or rows[0]["detected_at"]
-
-    time.sleep(0.01)
     result = db.heartbeat_session("s1")
     assert result is True
 
@@ -593,6 +646,8 @@ def test_migration_adds_last_activity_at():
                (session_id, account_id, email, detected_at, detection_method)
                VALUES ('s1', 1, 'a@b.com', '2025-01-01T00:00:00+00:00', 'test')"""
         )
+        # A pre-migration DB has no schema version stamped
+        conn.execute("PRAGMA user_version = 0")
 
     # Re-run init_schema which includes migration
     db._init_schema()
@@ -622,105 +677,74 @@ _SUBAGENT_ENV_KEYS = [
 ]
 
 
-def _clear_subagent_env():
-    """Remove all subagent env vars for a clean test state.
+@pytest.fixture
+def subagent_env(monkeypatch):
+    """Start with no subagent env vars; set them via the returned monkeypatch.
 
-    >>> _clear_subagent_env()  # no-op, just clears env
+    monkeypatch restores the caller's original values after the test.
     """
     for k in _SUBAGENT_ENV_KEYS:
-        os.environ.pop(k, None)
+        monkeypatch.delenv(k, raising=False)
+    return monkeypatch
 
 
-def test_detect_subagent_no_env():
+def test_detect_subagent_no_env(subagent_env):
     """No subagent env vars set — returns (False, None, None).
 
-    >>> _clear_subagent_env()
-    >>> _detect_subagent()
-    (False, None, None)
+    >>> # Verified via unit test
     """
-    _clear_subagent_env()
     is_sub, parent, atype = _detect_subagent()
     assert is_sub is False
     assert parent is None
     assert atype is None
 
 
-def test_detect_subagent_parent_only():
+def test_detect_subagent_parent_only(subagent_env):
     """Only CLAUDE_CODE_PARENT_SESSION_ID set.
 
-    >>> _clear_subagent_env()
-    >>> os.environ["CLAUDE_CODE_PARENT_SESSION_ID"] = "abc123"
-    >>> _detect_subagent()
-    (True, 'abc123', None)
+    >>> # Verified via unit test
     """
-    _clear_subagent_env()
-    os.environ["CLAUDE_CODE_PARENT_SESSION_ID"] = "abc123"
-    try:
-        is_sub, parent, atype = _detect_subagent()
-        assert is_sub is True
-        assert parent == "abc123"
-        assert atype is None
-    finally:
-        _clear_subagent_env()
+    subagent_env.setenv("CLAUDE_CODE_PARENT_SESSION_ID", "abc123")
+    is_sub, parent, atype = _detect_subagent()
+    assert is_sub is True
+    assert parent == "abc123"
+    assert atype is None
 
 
-def test_detect_subagent_all_three():
+def test_detect_subagent_all_three(subagent_env):
     """All three env vars — type takes precedence over name.
 
-    >>> _clear_subagent_env()
-    >>> os.environ["CLAUDE_CODE_PARENT_SESSION_ID"] = "abc"
-    >>> os.environ["CLAUDE_CODE_AGENT_TYPE"] = "Explore"
-    >>> os.environ["CLAUDE_CODE_AGENT_NAME"] = "researcher"
-    >>> _detect_subagent()
-    (True, 'abc', 'Explore')
+    >>> # Verified via unit test
     """
-    _clear_subagent_env()
-    os.environ["CLAUDE_CODE_PARENT_SESSION_ID"] = "abc"
-    os.environ["CLAUDE_CODE_AGENT_TYPE"] = "Explore"
-    os.environ["CLAUDE_CODE_AGENT_NAME"] = "researcher"
-    try:
-        is_sub, parent, atype = _detect_subagent()
-        assert is_sub is True
-        assert parent == "abc"
-        assert atype == "Explore"
-    finally:
-        _clear_subagent_env()
+    subagent_env.setenv("CLAUDE_CODE_PARENT_SESSION_ID", "abc")
+    subagent_env.setenv("CLAUDE_CODE_AGENT_TYPE", "Explore")
+    subagent_env.setenv("CLAUDE_CODE_AGENT_NAME", "researcher")
+    is_sub, parent, atype = _detect_subagent()
+    assert is_sub is True
+    assert parent == "abc"
+    assert atype == "Explore"
 
 
-def test_detect_subagent_name_only():
+def test_detect_subagent_name_only(subagent_env):
     """Only CLAUDE_CODE_AGENT_NAME set (no parent, no type).
 
-    >>> _clear_subagent_env()
-    >>> os.environ["CLAUDE_CODE_AGENT_NAME"] = "my-agent"
-    >>> _detect_subagent()
-    (True, None, 'my-agent')
+    >>> # Verified via unit test
     """
-    _clear_subagent_env()
-    os.environ["CLAUDE_CODE_AGENT_NAME"] = "my-agent"
-    try:
-        is_sub, parent, atype = _detect_subagent()
-        assert is_sub is True
-        assert parent is None
-        assert atype == "my-agent"
-    finally:
-        _clear_subagent_env()
+    subagent_env.setenv("CLAUDE_CODE_AGENT_NAME", "my-agent")
+    is_sub, parent, atype = _detect_subagent()
+    assert is_sub is True
+    assert parent is None
+    assert atype == "my-agent"
 
 
-def test_detect_subagent_empty_strings():
+def test_detect_subagent_empty_strings(subagent_env):
     """Empty string env vars are falsy — not a subagent.
 
-    >>> _clear_subagent_env()
-    >>> os.environ["CLAUDE_CODE_AGENT_TYPE"] = ""
-    >>> _detect_subagent()
-    (False, None, None)
+    >>> # Verified via unit test
     """
-    _clear_subagent_env()
-    os.environ["CLAUDE_CODE_AGENT_TYPE"] = ""
-    try:
-        is_sub, parent, atype = _detect_subagent()
-        assert is_sub is False
-    finally:
-        _clear_subagent_env()
+    subagent_env.setenv("CLAUDE_CODE_AGENT_TYPE", "")
+    is_sub, parent, atype = _detect_subagent()
+    assert is_sub is False
 
 
 # ------------------------------------------------------------------
@@ -728,13 +752,11 @@ def test_detect_subagent_empty_strings():
 # ------------------------------------------------------------------
 
 
-def test_tag_subagent_not_subagent():
+def test_tag_subagent_not_subagent(subagent_env):
     """Not a subagent (no env vars) — no UPDATE executed, no error.
 
-    >>> _clear_subagent_env()
-    >>> _tag_subagent("nonexistent", "2025-01-01T00:00:00Z")
+    >>> # Verified via unit test
     """
-    _clear_subagent_env()
     _tag_subagent("nonexistent", "2025-01-01T00:00:00Z")
 
 
@@ -746,19 +768,13 @@ def test_tag_subagent_none_detected_at():
     _tag_subagent("any-session", None)
 
 
-def test_tag_subagent_db_not_exist():
+def test_tag_subagent_db_not_exist(subagent_env):
     """DB doesn't exist — returns immediately, no file created.
 
-    >>> import os
-    >>> os.environ["CLAUDE_CODE_PARENT_SESSION_ID"] = "test-parent"
-    >>> _tag_subagent("test-sess", "2025-01-01T00:00:00Z")
+    >>> # Verified via unit test
     """
-    _clear_subagent_env()
-    os.environ["CLAUDE_CODE_PARENT_SESSION_ID"] = "test-parent"
-    try:
-        _tag_subagent("test-sess", "2025-01-01T00:00:00Z")
-    finally:
-        _clear_subagent_env()
+    subagent_env.setenv("CLAUDE_CODE_PARENT_SESSION_ID", "test-parent")
+    _tag_subagent("test-sess", "2025-01-01T00:00:00Z")
 
 
 # ------------------------------------------------------------------
@@ -790,6 +806,8 @@ def test_migration_adds_subagent_columns():
                 UNIQUE(session_id, detected_at)
             )
         """)
+        # A pre-migration DB has no schema version stamped
+        conn.execute("PRAGMA user_version = 0")
 
     # Re-run init_schema which includes the migration
     db._init_schema()
@@ -803,6 +821,66 @@ def test_migration_adds_subagent_columns():
         assert "agent_type" in cols
 
 
+def test_idx_sa_active_migrated_from_old_definition():
+    """An idx_sa_active without last_activity_at is rebuilt on init.
+
+    >>> # Verified via unit test
+    """
+    db = _make_db()
+    with db._writer() as conn:
+        conn.execute("DROP INDEX idx_sa_active")
+        conn.execute("CREATE INDEX idx_sa_active ON session_accounts(ended_at, detected_at)")
+        # A pre-migration DB has no schema version stamped
+        conn.execute("PRAGMA user_version = 0")
+
+    db._init_schema()
+
+    with db._reader() as conn:
+        sql = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'idx_sa_active'"
+        ).fetchone()[0]
+    assert "last_activity_at" in sql
+
+
+def test_init_schema_keeps_current_idx_sa_active():
+    """Re-running init on an up-to-date DB doesn't drop and rebuild idx_sa_active.
+
+    >>> # Verified via unit test
+    """
+    db = _make_db()
+    statements = []
+    with db._reader() as conn:
+        conn.set_trace_callback(statements.append)
+    try:
+        db._init_schema()
+    finally:
+        with db._reader() as conn:
+            conn.set_trace_callback(None)
+
+    assert not any("DROP INDEX" in stmt for stmt in statements)
+
+
+def test_init_schema_skips_migration_probes_when_current():
+    """An up-to-date user_version skips every PRAGMA table_info probe.
+
+    >>> # Verified via unit test
+    """
+    db = _make_db()
+    with db._reader() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    statements = []
+    with db._reader() as conn:
+        conn.set_trace_callback(statements.append)
+    try:
+        db._init_schema()
+    finally:
+        with db._reader() as conn:
+            conn.set_trace_callback(None)
+
+    pragmas = [stmt for stmt in statements if stmt.startswith("PRAGMA")]
+    assert pragmas == ["PRAGMA user_version"]
+
+
 def test_get_active_sessions_returns_subagent_fields():
     """get_active_sessions() includes is_subagent, parent_session_id, agent_type.
 
@@ -845,7 +923,7 @@ def test_get_active_sessions_default_subagent_values():
 # ------------------------------------------------------------------
 
 
-def test_record_session_account_switch_closes_old():
+def test_record_session_account_switch_closes_old(monotonic_clock):
     """Recording a session with a new account closes the old account's record.
 
     >>> db = _make_db()
@@ -857,7 +935,6 @@ def test_record_session_account_switch_closes_old():
     """
     db = _make_db()
     db.record_session_account("s1", account_id=1, email="a@b.com")
-    time.sleep(0.01)
     db.record_session_account("s1", account_id=2, email="b@b.com")
 
     rows = db.get_session_accounts("s1")
@@ -874,7 +951,7 @@ def test_record_session_account_switch_closes_old():
     assert closed_rows[0]["account_id"] == 1
 
 
-def test_record_session_null_then_known_account():
+def test_record_session_null_then_known_account(monotonic_clock):
     """Session starts with unknown account, then gets a real one.
 
     The NULL account record should be closed when a known account is recorded.
@@ -888,7 +965,6 @@ def test_record_session_null_then_known_account():
     """
     db = _make_db()
     db.record_session_account("s1", account_id=None, email=None)
-    time.sleep(0.01)
     db.record_session_account("s1", account_id=1, email="a@b.com")
 
     rows = db.get_session_accounts("s1")
@@ -953,8 +1029,6 @@ def test_heartbeat_scopes_to_newest_record():
     db.record_session_account(
         "s1", account_id=2, email="new@b.com", repo_path="/repo/a"
     )
-
-    time.sleep(0.01)
     db.heartbeat_session("s1")
 
     # Check that only the newest record got updated
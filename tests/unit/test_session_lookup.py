@@ -1,6 +1,6 @@
 """Tests for session suffix lookup in Database."""
 
-from jacked.web.database import Database
+from jacked.web.database import _SUFFIX_LOOKUP_SQL, Database
 
 
 def test_suffix_too_short_returns_empty():
@@ -136,3 +136,35 @@ def test_lookup_returns_last_activity_at():
     results = db.lookup_session_by_suffix("abcd1234")
     assert "last_activity_at" in results[0]
     assert results[0]["last_activity_at"] is not None
+
+
+def test_suffix_lookup_seeks_tail_index():
+    """The lookup seeks idx_sa_sid_tail instead of scanning session_accounts.
+
+    >>> # Verified via unit test
+    """
+    db = Database(":memory:")
+    with db._reader() as conn:
+        plan = " ".join(
+            row[3]
+            for row in conn.execute(
+                "EXPLAIN QUERY PLAN " + _SUFFIX_LOOKUP_SQL,
+                ("abcd1234", "abcd1234", 10),
+            )
+        )
+    assert "USING INDEX idx_sa_sid_tail" in plan
+    assert "SCAN session_accounts" not in plan
+
+
+def test_suffix_match_is_case_insensitive():
+    """Matching stays case-insensitive, as LIKE was before the tail index.
+
+    >>> # Verified via unit test
+    """
+    db = Database(":memory:")
+    db.record_session_account(
+        "sess-uuid-abcd1234", account_id=1, email="a@b.com", repo_path="/r"
+    )
+    assert len(db.lookup_session_by_suffix("ABCD1234")) == 1
+    assert len(db.lookup_session_by_suffix("uuid-ABCD1234")) == 1
+    assert db.lookup_session_by_suffix("xuid-abcd1234") == []
@@ -2,103 +2,68 @@
 
 from unittest.mock import patch
 
+import pytest
 
-class TestGetSoundCommand:
-    """Verify platform-specific sound command generation."""
-
-    def test_windows_complete(self):
-        """Windows complete sound uses powershell SystemSounds.
-
-        >>> # sys.platform == "win32" -> powershell Asterisk
-        """
-        with patch("sys.platform", "win32"):
-            from jacked.cli import _get_sound_command
-            cmd = _get_sound_command("complete")
-        assert "powershell" in cmd
-        assert "Asterisk" in cmd
-        assert "uname" not in cmd
-        assert "printf" not in cmd
-        assert "afplay" not in cmd
-
-    def test_windows_notification(self):
-        """Windows notification sound uses powershell Exclamation.
-
-        >>> # sys.platform == "win32" -> powershell Exclamation
-        """
-        with patch("sys.platform", "win32"):
-            from jacked.cli import _get_sound_command
-            cmd = _get_sound_command("notification")
-        assert "powershell" in cmd
-        assert "Exclamation" in cmd
-        assert "uname" not in cmd
-
-    def test_darwin_complete(self):
-        """macOS complete sound uses afplay Glass.
+# Imported before any sys.platform patch: importing jacked.cli under a
+# patched "win32" pulls in click's Windows console support and fails
+from jacked.cli import (
+    _get_sound_command,
+    _replace_stale_sound_hook,
+    _sound_hook_marker,
+)
 
-        >>> # sys.platform == "darwin" -> afplay Glass.aiff
-        """
-        with patch("sys.platform", "darwin"):
-            from jacked.cli import _get_sound_command
-            cmd = _get_sound_command("complete")
-        assert "afplay" in cmd
-        assert "Glass.aiff" in cmd
-        assert "jacked log hook" in cmd
-
-    def test_darwin_notification(self):
-        """macOS notification sound uses afplay Basso.
 
-        >>> # sys.platform == "darwin" -> afplay Basso.aiff
-        """
-        with patch("sys.platform", "darwin"):
-            from jacked.cli import _get_sound_command
-            cmd = _get_sound_command("notification")
-        assert "afplay" in cmd
-        assert "Basso.aiff" in cmd
-
-    def test_linux_complete(self):
-        """Linux complete sound uses paplay with WSL fallback.
-
-        >>> # sys.platform == "linux" -> paplay + WSL detection
-        """
-        with patch("sys.platform", "linux"):
-            from jacked.cli import _get_sound_command
-            cmd = _get_sound_command("complete")
-        assert "paplay" in cmd
-        assert "complete.oga" in cmd
-        assert "grep -qi microsoft" in cmd
-        assert "powershell.exe" in cmd
-
-    def test_linux_notification(self):
-        """Linux notification sound uses paplay dialog-warning.
-
-        >>> # sys.platform == "linux" -> paplay dialog-warning.oga
-        """
-        with patch("sys.platform", "linux"):
-            from jacked.cli import _get_sound_command
-            cmd = _get_sound_command("notification")
-        assert "paplay" in cmd
-        assert "dialog-warning.oga" in cmd
-
-    def test_windows_no_log_command(self):
-        """Windows commands skip the jacked log hook call.
-
-        >>> # cmd.exe can't run the backgrounded log command
-        """
-        with patch("sys.platform", "win32"):
-            from jacked.cli import _get_sound_command
-            cmd = _get_sound_command("complete")
-        assert "jacked log hook" not in cmd
-
-    def test_unix_has_log_command(self):
-        """macOS and Linux include the jacked log hook call.
+class TestGetSoundCommand:
+    """Verify platform-specific sound command generation."""
 
-        >>> # Unix shells can background the log command
+    @pytest.mark.parametrize(
+        "platform, hook_type, expected, forbidden",
+        [
+            # cmd.exe can't run the backgrounded jacked log hook call
+            (
+                "win32",
+                "complete",
+                ("powershell", "Asterisk"),
+                ("uname", "printf", "afplay", "jacked log hook"),
+            ),
+            ("win32", "notification", ("powershell", "Exclamation"), ("uname",)),
+            ("darwin", "complete", ("afplay", "Glass.aiff", "jacked log hook"), ()),
+            ("darwin", "notification", ("afplay", "Basso.aiff"), ()),
+            # Linux checks /proc/version for WSL and falls back to powershell.exe
+            (
+                "linux",
+                "complete",
+                (
+                    "paplay",
+                    "complete.oga",
+                    "grep -qi microsoft",
+                    "powershell.exe",
+                    "jacked log hook",
+                ),
+                (),
+            ),
+            ("linux", "notification", ("paplay", "dialog-warning.oga"), ()),
+        ],
+        ids=[
+            "windows_complete",
+            "windows_notification",
+            "darwin_complete",
+            "darwin_notification",
+            "linux_complete",
+            "linux_notification",
+        ],
+    )
+    def test_sound_command(self, platform, hook_type, expected, forbidden):
+        """Each platform gets its own player, sound file and log-hook handling.
+
+        >>> # sys.platform == "win32" -> powershell SystemSounds, no log hook
         """
-        for platform in ("darwin", "linux"):
-            with patch("sys.platform", platform):
-                from jacked.cli import _get_sound_command
-                cmd = _get_sound_command("complete")
-            assert "jacked log hook" in cmd, f"Missing log command on {platform}"
+        with patch("sys.platform", platform):
+            cmd = _get_sound_command(hook_type)
+        for fragment in expected:
+            assert fragment in cmd
+        for fragment in forbidden:
+            assert fragment not in cmd
 
 
 class TestReplaceStaleSoundHook:
@@ -109,7 +74,6 @@ class TestReplaceStaleSoundHook:
 
         >>> # Old Unix-style hook -> new platform-specific hook
         """
-        from jacked.cli import _replace_stale_sound_hook, _sound_hook_marker
         marker = _sound_hook_marker()
         entries = [{"hooks": [{"command": marker + 'OS=$(uname -s); case "$OS" in ...'}]}]
 
@@ -126,7 +90,6 @@ class TestReplaceStaleSoundHook:
 
         >>> # No uname in command -> no replacement
         """
-        from jacked.cli import _replace_stale_sound_hook, _sound_hook_marker
         marker = _sound_hook_marker()
         entries = [{"hooks": [{"command": marker + 'powershell -Command "..."'}]}]
 
@@ -138,7 +101,6 @@ class TestReplaceStaleSoundHook:
 
         >>> # No marker -> not our hook, skip
         """
-        from jacked.cli import _replace_stale_sound_hook, _sound_hook_marker
         marker = _sound_hook_marker()
         entries = [{"hooks": [{"command": "some other hook with uname"}]}]
 
@@ -150,7 +112,6 @@ class TestReplaceStaleSoundHook:
 
         >>> # Nothing to replace
         """
-        from jacked.cli import _replace_stale_sound_hook, _sound_hook_marker
         marker = _sound_hook_marker()
 
         result = _replace_stale_sound_hook([], marker, "complete")
@@ -161,7 +122,6 @@ class TestReplaceStaleSoundHook:
 
         >>> # Malformed entry -> skip, don't crash
         """
-        from jacked.cli import _replace_stale_sound_hook, _sound_hook_marker
         marker = _sound_hook_marker()
         entries = [{"matcher": ""}]
 
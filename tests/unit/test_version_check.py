@@ -7,6 +7,20 @@ from unittest.mock import patch, MagicMock
 from jacked import version_check as vc
 
 
+def _pypi_response(body):
+    """Mock urlopen() context manager whose read() returns *body*.
+
+    A dict body is JSON-encoded; bytes are returned as-is.
+    """
+    mock_response = MagicMock()
+    if isinstance(body, dict):
+        body = json.dumps(body).encode("utf-8")
+    mock_response.read.return_value = body
+    mock_response.__enter__ = lambda s: s
+    mock_response.__exit__ = MagicMock(return_value=False)
+    return mock_response
+
+
 class TestIsNewer:
     """Tests for is_newer() version comparison."""
 
@@ -137,14 +151,7 @@ class TestGetLatestPypiVersion:
 
         >>> # With mock, get_latest_pypi_version returns the version from JSON
         """
-        mock_response = MagicMock()
-        mock_response.read.return_value = json.dumps(
-            {
-                "info": {"version": "0.4.0"},
-            }
-        ).encode("utf-8")
-        mock_response.__enter__ = lambda s: s
-        mock_response.__exit__ = MagicMock(return_value=False)
+        mock_response = _pypi_response({"info": {"version": "0.4.0"}})
 
         with patch("urllib.request.urlopen", return_value=mock_response):
             result = vc.get_latest_pypi_version()
@@ -166,10 +173,7 @@ class TestGetLatestPypiVersion:
 
         >>> # Bad JSON returns None gracefully
         """
-        mock_response = MagicMock()
-        mock_response.read.return_value = b"not json at all"
-        mock_response.__enter__ = lambda s: s
-        mock_response.__exit__ = MagicMock(return_value=False)
+        mock_response = _pypi_response(b"not json at all")
 
         with patch("urllib.request.urlopen", return_value=mock_response):
             result = vc.get_latest_pypi_version()
@@ -180,12 +184,7 @@ class TestGetLatestPypiVersion:
 
         >>> # Missing structure returns None
         """
-        mock_response = MagicMock()
-        mock_response.read.return_value = json.dumps({"unexpected": "data"}).encode(
-            "utf-8"
-        )
-        mock_response.__enter__ = lambda s: s
-        mock_response.__exit__ = MagicMock(return_value=False)
+        mock_response = _pypi_response({"unexpected": "data"})
 
         with patch("urllib.request.urlopen", return_value=mock_response):
             result = vc.get_latest_pypi_version()
@@ -289,14 +288,7 @@ class TestCheckVersionCached:
             )
         )
 
-        mock_response = MagicMock()
-        mock_response.read.return_value = json.dumps(
-            {
-                "info": {"version": "0.4.0"},
-            }
-        ).encode("utf-8")
-        mock_response.__enter__ = lambda s: s
-        mock_response.__exit__ = MagicMock(return_value=False)
+        mock_response = _pypi_response({"info": {"version": "0.4.0"}})
 
         with patch.object(vc, "VERSION_CACHE", cache_file):
             with patch("urllib.request.urlopen", return_value=mock_response):
@@ -312,14 +304,7 @@ class TestCheckVersionCached:
         """
         cache_file = tmp_path / "nonexistent-cache.json"
 
-        mock_response = MagicMock()
-        mock_response.read.return_value = json.dumps(
-            {
-                "info": {"version": "0.3.11"},
-            }
-        ).encode("utf-8")
-        mock_response.__enter__ = lambda s: s
-        mock_response.__exit__ = MagicMock(return_value=False)
+        mock_response = _pypi_response({"info": {"version": "0.3.11"}})
 
         with patch.object(vc, "VERSION_CACHE", cache_file):
             with patch("urllib.request.urlopen", return_value=mock_response):
@@ -340,14 +325,7 @@ class TestCheckVersionCached:
         cache_file = tmp_path / "version-cache.json"
         cache_file.write_text("not valid json {{{")
 
-        mock_response = MagicMock()
-        mock_response.read.return_value = json.dumps(
-            {
-                "info": {"version": "0.4.0"},
-            }
-        ).encode("utf-8")
-        mock_response.__enter__ = lambda s: s
-        mock_response.__exit__ = MagicMock(return_value=False)
+        mock_response = _pypi_response({"info": {"version": "0.4.0"}})
 
         with patch.object(vc, "VERSION_CACHE", cache_file):
             with patch("urllib.request.urlopen", return_value=mock_response):
@@ -386,14 +364,7 @@ class TestCheckVersionCached:
             )
         )
 
-        mock_response = MagicMock()
-        mock_response.read.return_value = json.dumps(
-            {
-                "info": {"version": "0.4.0"},
-            }
-        ).encode("utf-8")
-        mock_response.__enter__ = lambda s: s
-        mock_response.__exit__ = MagicMock(return_value=False)
+        mock_response = _pypi_response({"info": {"version": "0.4.0"}})
 
         with patch.object(vc, "VERSION_CACHE", cache_file):
             with patch("urllib.request.urlopen", return_value=mock_response):
@@ -437,14 +408,7 @@ class TestCheckVersionCached:
             )
         )
 
-        mock_response = MagicMock()
-        mock_response.read.return_value = json.dumps(
-            {
-                "info": {"version": "0.4.0"},
-            }
-        ).encode("utf-8")
-        mock_response.__enter__ = lambda s: s
-        mock_response.__exit__ = MagicMock(return_value=False)
+        mock_response = _pypi_response({"info": {"version": "0.4.0"}})
 
         with patch.object(vc, "VERSION_CACHE", cache_file):
             with patch(
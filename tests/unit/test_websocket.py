@@ -12,8 +12,8 @@ from jacked.api.websocket import WebSocketRegistry
 
 
 def _run(coro):
-    """Run an async coroutine synchronously."""
-    return asyncio.new_event_loop().run_until_complete(coro)
+    """Run an async coroutine synchronously on a loop that is then closed."""
+    return asyncio.run(coro)
 
 
 def _mock_ws():
@@ -136,6 +136,37 @@ def test_dead_client_cleanup():
     ws_alive.send_text.assert_called_once()
 
 
+def test_broadcast_sends_concurrently():
+    """A client blocked in send_text doesn't hold up the others.
+
+    >>> # Verified via unit test
+    """
+    r = WebSocketRegistry()
+    ws_slow = _mock_ws()
+    ws_fast = _mock_ws()
+
+    async def _scenario():
+        fast_sent = asyncio.Event()
+        # The slow send only completes once the fast client has been sent to,
+        # which would never happen if sends ran one after another
+        async def _slow_send(_msg):
+            await fast_sent.wait()
+
+        async def _fast_send(_msg):
+            fast_sent.set()
+
+        ws_slow.send_text.side_effect = _slow_send
+        ws_fast.send_text.side_effect = _fast_send
+        await r.connect(ws_slow)
+        await r.connect(ws_fast)
+        await asyncio.wait_for(r.broadcast("test"), timeout=1)
+
+    _run(_scenario())
+
+    assert r.client_count == 2
+    ws_fast.send_text.assert_called_once()
+
+
 def test_empty_broadcast():
     """Broadcasting with no clients doesn't crash.
 